@@ -1,13 +1,39 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Header, Query, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from uuid import UUID
 from typing import List, Optional
 
-from app.services.js_file_service import JSFileService
-from app.models.schemas import JSFileCreate, JSFileResponse
+from app.services.js_file_service import JSFileService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.models.schemas import (
+    JSFileBatchFetchRequest, JSFileBatchFetchResult, JSFileCreate, JSFilePage, JSFileProjection, JSFileResponse, JSFileVersionContent, JSFileVersionDiff,
+    JSFileVersionResponse, HostHealthResponse,
+)
 
 router = APIRouter()
 service = JSFileService()
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parses a comma-separated `fields` query parameter into a field mask.
+    """
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> List[str]:
+    """
+    Parses an Accept-Encoding header into the codings it accepts, skipping those given q=0.
+    """
+    if not accept_encoding:
+        return []
+    encodings = []
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        quality = params.strip().lower().replace(' ', '')
+        if coding.strip() and quality not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.append(coding.strip().lower())
+    return encodings
+
 @router.post("/js-files/", response_model=List[JSFileResponse])
 async def add_js_files(files: List[JSFileCreate], fetch_content: bool = Query(True)):
     """
@@ -15,8 +41,12 @@ async def add_js_files(files: List[JSFileCreate], fetch_content: bool = Query(Tr
     optionally fetching their content immediately.
     
     - `fetch_content`: Set to `False` to prevent content from being fetched on creation.
+      Only files that were not tracked yet are fetched.
     """
-    return await service.add_files(files, fetch_content=fetch_content)
+    results = await service.add_files([file.model_dump() for file in files])
+    if not fetch_content:
+        return results
+    return await service.fetch_created_files(results)
 
 @router.put("/js-files/{file_id}/fetch-content", response_model=JSFileResponse)
 async def fetch_and_update_js_file_content(file_id: UUID):
@@ -29,11 +59,116 @@ async def fetch_and_update_js_file_content(file_id: UUID):
         raise HTTPException(status_code=404, detail=f"File with id {file_id} not found.")
     return updated_file
 
-@router.get("/js-files/", response_model=List[JSFileResponse])
-async def list_js_files(company_id: Optional[UUID] = Query(None)):
+@router.post("/js-files/batch-fetch-content")
+async def batch_fetch_and_update_js_file_content(batch: JSFileBatchFetchRequest):
+    """
+    Endpoint to fetch and update many files at once, by ID and/or company.
+
+    Outcomes (`changed`, `unchanged`, `error` or `not_found`) are streamed back as
+    newline-delimited JSON as soon as each file is done.
+    """
+    if not batch.file_ids and not batch.company_id:
+        raise HTTPException(status_code=400, detail="Provide file_ids and/or company_id.")
+
+    async def results():
+        async for refreshed in service.batch_refresh(batch.file_ids, batch.company_id):
+            result = JSFileBatchFetchResult(
+                file_id=refreshed.file_id,
+                status=refreshed.status,
+                error=refreshed.error,
+                file=refreshed.file,
+            )
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.get("/js-files/", response_model=List[JSFileProjection], response_model_exclude_unset=True)
+async def list_js_files(company_id: Optional[UUID] = Query(None), fields: Optional[str] = Query(None)):
     """
     Endpoint to list all JavaScript files, optionally filtered by company ID.
+
+    - `fields`: Comma-separated list of fields to return (e.g. `url,host,last_fetched`).
+      `id` is always returned; omit to return every field.
+    """
+    try:
+        if company_id:
+            return await service.list_files_by_company(company_id, fetch_content=False, fields=parse_fields(fields))
+        return await service.list_all_files(fetch_content=False, fields=parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/js-files/page", response_model=JSFilePage, response_model_exclude_unset=True)
+async def list_js_files_page(
+    company_id: Optional[UUID] = Query(None),
+    after: Optional[UUID] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None),
+):
+    """
+    Endpoint to list JavaScript files one page at a time, ordered by ID.
+
+    - `after`: Pass the `next_cursor` of the previous page to get the next one.
+    - `fields`: Comma-separated list of fields to return; omit to return every field.
+    """
+    try:
+        files, next_cursor = await service.list_files_page(
+            company_id, after=after, limit=limit, fields=parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSFilePage(items=files, next_cursor=next_cursor)
+
+@router.get("/js-files/{file_id}/content")
+async def get_js_file_content(file_id: UUID, accept_encoding: Optional[str] = Header(None)):
+    """
+    Endpoint to download the stored content of a file.
+
+    Content is sent as stored, with a `Content-Encoding` header, when its encoding
+    (`zstd` or `deflate`) is listed in `Accept-Encoding`; otherwise it is decompressed.
+    """
+    result = await service.get_content(file_id, parse_accept_encoding(accept_encoding))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"File with id {file_id} not found.")
+    data, encoding = result
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"File with id {file_id} has no content yet.")
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=data, media_type="application/javascript", headers=headers)
+
+@router.get("/js-files/{file_id}/versions", response_model=List[JSFileVersionResponse])
+async def list_js_file_versions(file_id: UUID):
+    """
+    Endpoint to list the stored content versions of a file, newest first.
+    """
+    return await service.list_versions(file_id)
+
+@router.get("/js-file-versions/{version_id}", response_model=JSFileVersionContent)
+async def get_js_file_version(version_id: UUID):
+    """
+    Endpoint to fetch the reconstructed content of a stored version.
+    """
+    result = await service.get_version(version_id)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"Version with id {version_id} not found.")
+    return result
+
+@router.get("/js-file-versions/{from_version_id}/diff/{to_version_id}", response_model=JSFileVersionDiff)
+async def diff_js_file_versions(from_version_id: UUID, to_version_id: UUID, context_lines: int = Query(3, ge=0)):
+    """
+    Endpoint to get a unified diff between two stored versions.
+    """
+    result = await service.diff_versions(from_version_id, to_version_id, context_lines)
+    if not result:
+        raise HTTPException(status_code=404, detail="One or both versions were not found.")
+    return result
+
+@router.get("/hosts/health", response_model=List[HostHealthResponse])
+async def get_host_health(hosts: Optional[str] = Query(None), unhealthy_only: bool = Query(False)):
+    """
+    Endpoint to report the rate limit, backoff and circuit breaker state of fetched hosts.
+    `hosts` is a comma-separated list; every host fetched so far by default.
     """
-    if company_id:
-        return await service.list_files_by_company(company_id)
-    return await service.list_all_files()
\ No newline at end of file
+    hosts = [host.strip() for host in hosts.split(',') if host.strip()] if hosts else None
+    return service.host_health(hosts, unhealthy_only)
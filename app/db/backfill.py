@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import sys
+
+from sqlalchemy import select
+
+from app.db.database import database
+from app.models.js_file_model import js_files, sha256_hex
+from app.services.blob_store import blob_store
+
+
+async def backfill_content_hashes(batch_size: int = 1000) -> int:
+    """
+    Fills content_hash for rows stored before the column existed, in batches so no
+    single statement holds locks on the whole table. The digest is computed inside
+    Postgres over the UTF-8 encoding of the stored text, which matches what the
+    fetcher computes for UTF-8 bodies. Returns the number of rows updated.
+    """
+    pending = (
+        select(js_files.c.id)
+        .where(js_files.c.content_hash.is_(None))
+        .where(js_files.c.content.is_not(None))
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    query = (
+        js_files.update()
+        .where(js_files.c.id.in_(pending))
+        .values(content_hash=sha256_hex(js_files.c.content))
+        .returning(js_files.c.id)
+    )
+
+    total = 0
+    while True:
+        updated = await database.fetch_all(query)
+        if not updated:
+            return total
+        total += len(updated)
+        print(f"Backfilled content_hash for {total} files...")
+
+
+async def move_content_to_blobs(batch_size: int = 100) -> int:
+    """
+    Moves content still stored inline in js_files into the shared blob store,
+    one transaction per batch. Returns the number of rows moved.
+    """
+    query = (
+        select(js_files.c.id, js_files.c.content, js_files.c.content_hash)
+        .where(js_files.c.content.is_not(None))
+        .limit(batch_size)
+    )
+
+    total = 0
+    while True:
+        async with database.transaction():
+            records = await database.fetch_all(query.with_for_update(skip_locked=True))
+            if not records:
+                return total
+            for record in records:
+                content_hash = record.content_hash or hashlib.sha256(record.content.encode('utf-8')).hexdigest()
+                await blob_store.put(content_hash, record.content)
+                await database.execute(
+                    js_files.update()
+                    .where(js_files.c.id == record.id)
+                    .values(content=None, content_hash=content_hash)
+                )
+        total += len(records)
+        print(f"Moved content of {total} files to the blob store...")
+
+
+TASKS = {
+    "hashes": backfill_content_hashes,
+    "blobs": move_content_to_blobs,
+}
+
+
+async def main():
+    task = sys.argv[1] if len(sys.argv) > 1 else "hashes"
+    if task not in TASKS and task != "gc":
+        sys.exit(f"Usage: python -m app.db.backfill [{'|'.join(TASKS)}|gc] [batch_size]")
+
+    await database.connect()
+    try:
+        if task == "gc":
+            removed = await blob_store.collect_garbage()
+            print(f"Done: {removed} unreferenced blobs removed.")
+        else:
+            batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            total = await (TASKS[task](batch_size) if batch_size else TASKS[task]())
+            print(f"Done: {total} files backfilled.")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
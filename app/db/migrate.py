@@ -0,0 +1,200 @@
+import asyncio
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import asyncpg
+
+from app.db.database import DATABASE_URL
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+# First line marking a migration that must run outside a transaction (CREATE INDEX CONCURRENTLY).
+NO_TRANSACTION = '-- migrate: no-transaction'
+# pg_advisory_lock key held while migrating, so concurrent runners apply each migration once.
+LOCK_KEY = 7_305_418_260
+DEFAULT_PARTITIONS = 16
+
+# Secondary js_files indexes, recreated on the partitioned table by partition_js_files().
+JS_FILES_INDEXES = {
+    "ix_js_files_company_id_id": "(company_id, id)",
+    "ix_js_files_host": "(host)",
+    "ix_js_files_due": "(priority, last_fetched NULLS FIRST)",
+    "ix_js_files_last_updated": "(last_updated)",
+    "ix_js_files_next_fetch_at": "(next_fetch_at NULLS FIRST)",
+}
+
+
+@dataclass
+class Migration:
+    version: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.startswith(NO_TRANSACTION)
+
+
+def load_migrations() -> List[Migration]:
+    """
+    Returns the migrations in app/db/migrations, ordered by their numeric prefix.
+    """
+    return [Migration(path.stem, path) for path in sorted(MIGRATIONS_DIR.glob('*.sql'))]
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Splits a migration into statements ending with `;` at the end of a line, dropping comments.
+    """
+    statements, current = [], []
+    for line in sql.splitlines():
+        if line.strip().startswith('--'):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(';'):
+            statement = '\n'.join(current).strip()
+            if statement != ';':
+                statements.append(statement)
+            current = []
+    if '\n'.join(current).strip():
+        statements.append('\n'.join(current).strip())
+    return statements
+
+
+async def connect(url: Optional[str] = None) -> asyncpg.Connection:
+    # asyncpg takes a plain postgresql:// DSN, without SQLAlchemy's driver suffix.
+    return await asyncpg.connect((url or DATABASE_URL).replace('+asyncpg', '', 1))
+
+
+async def _ensure_history(connection: asyncpg.Connection):
+    await connection.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version TEXT PRIMARY KEY,"
+        " applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now())"
+    )
+
+
+async def applied_versions(connection: asyncpg.Connection) -> List[str]:
+    await _ensure_history(connection)
+    rows = await connection.fetch("SELECT version FROM schema_migrations ORDER BY version")
+    return [row['version'] for row in rows]
+
+
+async def migrate(url: Optional[str] = None) -> List[str]:
+    """
+    Applies every pending migration in order and returns the versions applied.
+    """
+    connection = await connect(url)
+    applied = []
+    try:
+        await connection.execute("SELECT pg_advisory_lock($1)", LOCK_KEY)
+        done = set(await applied_versions(connection))
+        for migration in load_migrations():
+            if migration.version in done:
+                continue
+            print(f"Applying migration {migration.version}...")
+            if migration.transactional:
+                async with connection.transaction():
+                    await connection.execute(migration.sql)
+                    await connection.execute("INSERT INTO schema_migrations (version) VALUES ($1)",
+                                             migration.version)
+            else:
+                # Statements are idempotent, so a migration interrupted halfway can simply be rerun.
+                for statement in split_statements(migration.sql):
+                    await connection.execute(statement)
+                await connection.execute("INSERT INTO schema_migrations (version) VALUES ($1)", migration.version)
+            applied.append(migration.version)
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+        await connection.close()
+    return applied
+
+
+def partition_sql(partitions: int) -> List[str]:
+    """
+    Statements converting js_files into a table hash-partitioned by company_id.
+    The original table is kept as js_files_unpartitioned until dropped by hand.
+    """
+    statements = [
+        "LOCK TABLE js_files IN ACCESS EXCLUSIVE MODE",
+        "ALTER TABLE js_files RENAME TO js_files_unpartitioned",
+        "ALTER TABLE js_files_unpartitioned RENAME CONSTRAINT js_files_pkey TO js_files_unpartitioned_pkey",
+        "ALTER TABLE js_files_unpartitioned RENAME CONSTRAINT uq_js_files_company_url"
+        " TO uq_js_files_unpartitioned_company_url",
+    ]
+    statements += [
+        f"ALTER INDEX IF EXISTS {name} RENAME TO {name.replace('ix_js_files_', 'ix_js_files_unpartitioned_')}"
+        for name in JS_FILES_INDEXES
+    ]
+    statements += [
+        "CREATE TABLE js_files (LIKE js_files_unpartitioned INCLUDING DEFAULTS) PARTITION BY HASH (company_id)",
+        # Unique constraints on a partitioned table must include the partition key.
+        "ALTER TABLE js_files ADD CONSTRAINT js_files_pkey PRIMARY KEY (company_id, id)",
+        "ALTER TABLE js_files ADD CONSTRAINT uq_js_files_company_url UNIQUE (company_id, url)",
+    ]
+    statements += [
+        f"CREATE TABLE js_files_p{remainder} PARTITION OF js_files"
+        f" FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+    statements += [f"CREATE INDEX {name} ON js_files {columns}" for name, columns in JS_FILES_INDEXES.items()]
+    statements.append("INSERT INTO js_files SELECT * FROM js_files_unpartitioned")
+    return statements
+
+
+async def partition_js_files(partitions: int = DEFAULT_PARTITIONS, url: Optional[str] = None) -> bool:
+    """
+    Optionally hash-partitions js_files by company_id, copying the rows in one transaction.
+    Company-scoped queries then only touch one partition, while lookups by id alone probe
+    every partition's primary key. Postgres cannot build indexes CONCURRENTLY on a
+    partitioned table, so later js_files index migrations must then run in a transaction.
+    Returns False if js_files is already partitioned.
+    """
+    connection = await connect(url)
+    try:
+        await connection.execute("SELECT pg_advisory_lock($1)", LOCK_KEY)
+        kind = await connection.fetchval("SELECT relkind FROM pg_class WHERE oid = 'js_files'::regclass")
+        if kind == 'p':
+            return False
+        async with connection.transaction():
+            for statement in partition_sql(partitions):
+                await connection.execute(statement)
+        return True
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+        await connection.close()
+
+
+async def print_status(url: Optional[str] = None):
+    connection = await connect(url)
+    try:
+        done = set(await applied_versions(connection))
+    finally:
+        await connection.close()
+    for migration in load_migrations():
+        print(f"{'applied' if migration.version in done else 'pending'}  {migration.version}")
+
+
+async def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "up"
+    if command == "up":
+        applied = await migrate()
+        print(f"Done: {len(applied)} migrations applied.")
+    elif command == "status":
+        await print_status()
+    elif command == "partition":
+        partitions = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PARTITIONS
+        if await partition_js_files(partitions):
+            print(f"Done: js_files is now hash-partitioned into {partitions} partitions by company_id.")
+        else:
+            print("js_files is already partitioned.")
+    else:
+        sys.exit("Usage: python -m app.db.migrate [up|status|partition [partitions]]")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
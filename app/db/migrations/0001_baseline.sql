@@ -0,0 +1,52 @@
+-- Tables and columns as of the first migration. Every statement is idempotent, so the
+-- baseline can also be applied to databases created before migrations existed.
+
+CREATE TABLE IF NOT EXISTS js_files (
+    id UUID PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    content TEXT,
+    priority INTEGER,
+    company_id UUID NOT NULL,
+    last_fetched TIMESTAMP WITHOUT TIME ZONE,
+    last_updated TIMESTAMP WITHOUT TIME ZONE
+);
+
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS etag TEXT;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS last_modified TEXT;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS content_length BIGINT;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Fails if a company tracks the same URL twice; remove the duplicates first.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_js_files_company_url') THEN
+        ALTER TABLE js_files ADD CONSTRAINT uq_js_files_company_url UNIQUE (company_id, url);
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS js_blobs (
+    hash TEXT PRIMARY KEY,
+    data BYTEA NOT NULL,
+    encoding TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    compressed_size BIGINT NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS js_file_versions (
+    id UUID PRIMARY KEY,
+    file_id UUID NOT NULL,
+    seq INTEGER NOT NULL,
+    fetched_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    content_hash TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    is_snapshot BOOLEAN NOT NULL,
+    snapshot_id UUID NOT NULL,
+    encoding TEXT NOT NULL,
+    data BYTEA NOT NULL,
+    CONSTRAINT uq_js_file_versions_file_seq UNIQUE (file_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS ix_js_file_versions_snapshot_seq ON js_file_versions (snapshot_id, seq);
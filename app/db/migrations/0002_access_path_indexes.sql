@@ -0,0 +1,17 @@
+-- migrate: no-transaction
+-- Indexes for the hot queries, built CONCURRENTLY so writers are not blocked on large tables.
+
+-- Company listings and keyset pages (WHERE company_id = ? AND id > ? ORDER BY id).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_js_files_company_id_id ON js_files (company_id, id);
+
+-- Per-host lookups, e.g. everything served by one CDN.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_js_files_host ON js_files (host);
+
+-- What is due next for a priority: never fetched first, then the stalest.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_js_files_due ON js_files (priority, last_fetched NULLS FIRST);
+
+-- The scheduler's incremental sync of recently added rows.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_js_files_last_updated ON js_files (last_updated);
+
+-- Garbage collection of unreferenced blobs.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_js_blobs_unreferenced ON js_blobs (hash) WHERE refcount <= 0;
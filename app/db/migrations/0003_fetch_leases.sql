@@ -0,0 +1,10 @@
+-- Columns for lease-based claiming of due files by several workers (see LeaseScheduler).
+-- A NULL next_fetch_at means the file has never been scheduled and is due immediately,
+-- so no backfill is needed.
+
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS next_fetch_at TIMESTAMP WITHOUT TIME ZONE;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS lease_owner TEXT;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITHOUT TIME ZONE;
+
+-- Built in the transaction rather than CONCURRENTLY so it also works once js_files is partitioned.
+CREATE INDEX IF NOT EXISTS ix_js_files_next_fetch_at ON js_files (next_fetch_at NULLS FIRST);
@@ -0,0 +1,7 @@
+-- Per-file fetch history for change-rate-adaptive revisit intervals (see app.services.revisit).
+-- change_rate is the estimated number of changes per second, kept for inspection.
+
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS change_observations DOUBLE PRECISION;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS change_detections DOUBLE PRECISION;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS observed_seconds DOUBLE PRECISION;
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS change_rate DOUBLE PRECISION;
@@ -0,0 +1,4 @@
+-- Semantic fingerprint of the stored content (see app.services.fingerprint), used to tell
+-- meaningful changes from cosmetic ones. Rows get it with their next content change.
+
+ALTER TABLE js_files ADD COLUMN IF NOT EXISTS semantic_hash TEXT;
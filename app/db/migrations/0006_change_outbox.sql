@@ -0,0 +1,13 @@
+-- Transactional outbox for change notifications (see app.messaging.notifier.OutboxRelay).
+-- Rows are inserted with the content update and marked sent once RabbitMQ confirmed them.
+
+CREATE TABLE IF NOT EXISTS js_change_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    file_id UUID NOT NULL,
+    company_id UUID NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    sent_at TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS ix_js_change_outbox_unsent ON js_change_outbox (id) WHERE sent_at IS NULL;
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+from uuid import uuid4
+
+from sqlalchemy import or_, select
+
+from app.db.migrate import connect
+from app.db.repository import CLAIM_DUE, SELECT_FILE, TOUCH_FILE, PreparedQuery
+from app.models.js_file_model import js_blobs, js_change_outbox, js_file_versions, js_files
+from app.services.js_file_service import select_files
+
+SAMPLE_COMPANY = uuid4()
+SAMPLE_FILE = uuid4()
+NOW = datetime.now()
+
+# (name, query, values, indexes any of which the plan must use)
+CHECKS = [
+    ("file by id", SELECT_FILE, {"id": SAMPLE_FILE}, {"js_files_pkey"}),
+    ("touch unchanged file", TOUCH_FILE, {"id": SAMPLE_FILE, "last_fetched": NOW, "etag": None,
+                                          "last_modified": None, "content_length": None, "content_hash": None},
+     {"js_files_pkey"}),
+    ("files of a company", PreparedQuery(select_files().where(js_files.c.company_id == SAMPLE_COMPANY)), {},
+     {"ix_js_files_company_id_id", "uq_js_files_company_url"}),
+    ("keyset page of a company", PreparedQuery(
+        select_files()
+        .where(js_files.c.company_id == SAMPLE_COMPANY)
+        .where(js_files.c.id > SAMPLE_FILE)
+        .order_by(js_files.c.id)
+        .limit(500)
+    ), {}, {"ix_js_files_company_id_id"}),
+    ("files on a host", PreparedQuery(select(js_files.c.id).where(js_files.c.host == "cdn.example.com")), {},
+     {"ix_js_files_host"}),
+    ("due files by priority", PreparedQuery(
+        select(js_files.c.id)
+        .where(js_files.c.priority == 1)
+        .where(or_(js_files.c.last_fetched.is_(None), js_files.c.last_fetched < NOW - timedelta(minutes=5)))
+        .order_by(js_files.c.last_fetched.asc().nulls_first())
+        .limit(100)
+    ), {}, {"ix_js_files_due"}),
+    ("lease due files", CLAIM_DUE, {"owner": "plan-check", "limit": 100, "now": NOW,
+                                    "lease_until": NOW + timedelta(minutes=5)},
+     {"ix_js_files_next_fetch_at"}),
+    ("scheduler sync", PreparedQuery(
+        select(js_files.c.id).where(js_files.c.last_updated >= NOW - timedelta(minutes=1))
+    ), {}, {"ix_js_files_last_updated"}),
+    ("versions of a file", PreparedQuery(
+        select(js_file_versions.c.id)
+        .where(js_file_versions.c.file_id == SAMPLE_FILE)
+        .order_by(js_file_versions.c.seq.desc())
+    ), {}, {"uq_js_file_versions_file_seq"}),
+    ("unsent change outbox rows", PreparedQuery(
+        select(js_change_outbox.c.id, js_change_outbox.c.payload)
+        .where(js_change_outbox.c.sent_at.is_(None))
+        .order_by(js_change_outbox.c.id)
+        .limit(5000)
+    ), {}, {"ix_js_change_outbox_unsent"}),
+    ("unreferenced blobs", PreparedQuery(select(js_blobs.c.hash).where(js_blobs.c.refcount <= 0)), {},
+     {"ix_js_blobs_unreferenced"}),
+]
+
+
+def plan_indexes(plan: dict) -> Set[str]:
+    """
+    Returns the names of the indexes used anywhere in an EXPLAIN (FORMAT JSON) plan.
+    """
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
+
+
+def plan_nodes(plan: dict) -> List[str]:
+    nodes = [plan["Node Type"] + (f" on {plan['Relation Name']}" if "Relation Name" in plan else "")]
+    for child in plan.get("Plans", []):
+        nodes += plan_nodes(child)
+    return nodes
+
+
+async def check_plans(allow_seqscan: bool = False, url: Optional[str] = None,
+                      checks: Iterable = CHECKS) -> bool:
+    """
+    EXPLAINs every hot query and verifies the plan uses one of its expected indexes.
+    Sequential scans are disabled by default so the check is meaningful on the small
+    tables of a local or CI database. Returns True if every check passed.
+    """
+    connection = await connect(url)
+    ok = True
+    try:
+        if not allow_seqscan:
+            await connection.execute("SET enable_seqscan = off")
+        for name, query, values, expected in checks:
+            # EXPLAIN does not execute the statement, so the UPDATE checks write nothing.
+            raw = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {query.sql}", *query.args(values))
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            used = await _parent_indexes(connection, plan_indexes(plan))
+            passed = bool(used & expected)
+            ok = ok and passed
+            print(f"{'PASS' if passed else 'FAIL'}  {name}: {', '.join(plan_nodes(plan))}"
+                  f"{'' if passed else f' (expected one of {sorted(expected)})'}")
+    finally:
+        await connection.close()
+    return ok
+
+
+async def _parent_indexes(connection, names: Set[str]) -> Set[str]:
+    # On a partitioned js_files the plan names each partition's index; map them to the parent index.
+    rows = await connection.fetch(
+        "SELECT child.relname AS name, coalesce(parent.relname, child.relname) AS parent"
+        " FROM pg_class child"
+        " LEFT JOIN pg_inherits i ON i.inhrelid = child.oid"
+        " LEFT JOIN pg_class parent ON parent.oid = i.inhparent"
+        " WHERE child.relname = ANY($1::text[])",
+        list(names),
+    )
+    return names | {row['parent'] for row in rows}
+
+
+async def main():
+    allow_seqscan = '--allow-seqscan' in sys.argv[1:]
+    if not await check_plans(allow_seqscan):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,244 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import bindparam, func, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.db.database import DATABASE_URL
+from app.metrics import DB_LATENCY, query_operation
+from app.models.js_file_model import js_files, sha256_hex
+
+# Size of the repository pool, on top of the `databases` pool (see app.db.database). Its
+# queries are single statements without transactions, so it needs fewer connections.
+POOL_MIN_SIZE = int(os.getenv('DB_REPOSITORY_POOL_MIN_SIZE', '2'))
+POOL_MAX_SIZE = int(os.getenv('DB_REPOSITORY_POOL_MAX_SIZE', '10'))
+# Prepared statements kept per connection, and how long an idle connection is kept open.
+STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '512'))
+MAX_INACTIVE_CONNECTION_LIFETIME = float(os.getenv('DB_MAX_INACTIVE_CONNECTION_LIFETIME', '300'))
+COMMAND_TIMEOUT = float(os.getenv('DB_COMMAND_TIMEOUT', '30'))
+
+# Every column except the (potentially multi-megabyte) content. Rows hashed before
+# content_hash existed get their digest computed in Postgres instead of shipping the content.
+METADATA_COLUMNS = [
+    column if column.name != "content_hash"
+    else func.coalesce(column, sha256_hex(js_files.c.content)).label("content_hash")
+    for column in js_files.c
+    if column.name != "content"
+] + [
+    # Whether the row still keeps its body inline rather than in js_blobs; IS NULL doesn't detoast.
+    js_files.c.content.is_not(None).label("has_inline_content"),
+]
+
+
+class Record(asyncpg.Record):
+    """
+    asyncpg record that also allows attribute access, like the rows returned by `databases`.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class PreparedQuery:
+    """
+    A SQLAlchemy Core statement compiled once into asyncpg's SQL. Executing it by the
+    same text lets asyncpg reuse the server-side prepared statement on each connection.
+    """
+
+    def __init__(self, statement):
+        compiled = statement.compile(dialect=asyncpg_dialect())
+        self.sql = str(compiled)
+        self.operation = query_operation(statement)
+        self._names = compiled.positiontup
+        self._defaults = compiled.params
+
+    def args(self, values: Dict[str, object]) -> list:
+        return [values[name] if name in values else self._defaults[name] for name in self._names]
+
+
+# Columns written when a fetch finds no change; the last four are the change-rate stats.
+TOUCH_FIELDS = (
+    "last_fetched", "etag", "last_modified", "content_length", "content_hash", "next_fetch_at",
+    "change_observations", "change_detections", "observed_seconds", "change_rate",
+)
+
+
+def _touch_values(source) -> dict:
+    values = {name: source[name] for name in TOUCH_FIELDS}
+    # A 304 carries no length or digest, so the stored ones are kept. The digest is only
+    # filled in for legacy rows: a touch must not undo a change a concurrent refresh stored.
+    values["content_length"] = func.coalesce(source["content_length"], js_files.c.content_length)
+    values["content_hash"] = func.coalesce(js_files.c.content_hash, source["content_hash"])
+    return values
+
+
+SELECT_FILE = PreparedQuery(
+    select(*METADATA_COLUMNS).where(js_files.c.id == bindparam("id"))
+)
+
+TOUCH_FILE = PreparedQuery(
+    js_files.update()
+    .where(js_files.c.id == bindparam("id"))
+    .values(**_touch_values({name: bindparam(name, type_=js_files.c[name].type) for name in TOUCH_FIELDS}))
+    .returning(*METADATA_COLUMNS)
+)
+
+# One typed array per column, zipped back into rows by unnest().
+_touched_many = select(*(
+    func.unnest(bindparam(name, type_=ARRAY(js_files.c[name].type))).label(name)
+    for name in ("id",) + TOUCH_FIELDS
+)).subquery()
+TOUCH_FILES = PreparedQuery(
+    js_files.update()
+    .where(js_files.c.id == _touched_many.c.id)
+    .values(**_touch_values(_touched_many.c))
+)
+
+# Due files in next_fetch_at order, skipping rows another worker is claiming right now.
+_due = (
+    select(js_files.c.id)
+    .where(or_(js_files.c.next_fetch_at.is_(None), js_files.c.next_fetch_at <= bindparam("now")))
+    .order_by(js_files.c.next_fetch_at.asc().nulls_first())
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+    .subquery("due")
+)
+# Claiming also pushes next_fetch_at to the lease expiry, so a file whose worker died
+# simply becomes due again once its lease runs out.
+CLAIM_DUE = PreparedQuery(
+    js_files.update()
+    .where(js_files.c.id == _due.c.id)
+    .values(
+        lease_owner=bindparam("owner"),
+        lease_expires_at=bindparam("lease_until"),
+        next_fetch_at=bindparam("lease_until"),
+    )
+    .returning(*METADATA_COLUMNS)
+)
+
+_released = select(
+    func.unnest(bindparam("ids", type_=ARRAY(js_files.c.id.type))).label("id"),
+    func.unnest(bindparam("next_fetch_at", type_=ARRAY(js_files.c.next_fetch_at.type))).label("next_fetch_at"),
+).subquery("released")
+RELEASE = PreparedQuery(
+    js_files.update()
+    .where(js_files.c.id == _released.c.id)
+    .where(js_files.c.lease_owner == bindparam("owner"))
+    .values(next_fetch_at=_released.c.next_fetch_at, lease_owner=None, lease_expires_at=None)
+)
+
+
+class JSFileRepository:
+    """
+    Data access for the hot, single-statement queries of the refresh path, over a
+    dedicated asyncpg pool.
+
+    Statements are compiled once at import instead of on every call, run through
+    asyncpg's per-connection prepared statement cache, and writes return the updated
+    row with UPDATE ... RETURNING so no follow-up SELECT is needed. Multi-statement
+    work that needs a transaction (storing a changed body) stays on `databases`.
+    """
+
+    def __init__(self, url: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None):
+        # asyncpg takes a plain postgresql:// DSN, without SQLAlchemy's driver suffix.
+        self.dsn = (url or DATABASE_URL).replace('+asyncpg', '', 1)
+        self.min_size = min_size or POOL_MIN_SIZE
+        self.max_size = max_size or POOL_MAX_SIZE
+
+        self._pool: Optional[asyncpg.Pool] = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        """
+        Opens the connection pool. Called implicitly by the first query.
+        """
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    statement_cache_size=STATEMENT_CACHE_SIZE,
+                    max_inactive_connection_lifetime=MAX_INACTIVE_CONNECTION_LIFETIME,
+                    command_timeout=COMMAND_TIMEOUT,
+                    record_class=Record,
+                )
+
+    async def close(self):
+        """
+        Closes the connection pool.
+        """
+        async with self._lock:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+
+    async def _run(self, method: str, query: PreparedQuery, values: Dict[str, object]):
+        if self._pool is None:
+            await self.connect()
+        start = time.perf_counter()
+        try:
+            return await getattr(self._pool, method)(query.sql, *query.args(values))
+        finally:
+            DB_LATENCY.labels(query.operation).observe(time.perf_counter() - start)
+
+    async def get_file(self, file_id: UUID) -> Optional[Record]:
+        """
+        Returns a file's METADATA_COLUMNS row, if it exists.
+        """
+        return await self._run('fetchrow', SELECT_FILE, {"id": file_id})
+
+    async def touch_file(self, file_id: UUID, values: Dict[str, object]) -> Optional[Record]:
+        """
+        Records a fetch that found no change and returns the updated METADATA_COLUMNS row.
+        `values` holds the TOUCH_FIELDS; a missing content_length / content_hash keeps the stored one.
+        """
+        return await self._run('fetchrow', TOUCH_FILE, {
+            "id": file_id, **{name: values.get(name) for name in TOUCH_FIELDS}
+        })
+
+    async def touch_files(self, updates: List[Dict[str, object]]) -> int:
+        """
+        Applies touch_file() to many files in one UPDATE ... FROM unnest(...) statement.
+        Each update holds an `id` and the TOUCH_FIELDS. Returns the number of rows updated.
+        """
+        if not updates:
+            return 0
+        status = await self._run('execute', TOUCH_FILES, {
+            name: [update.get(name) for update in updates] for name in ("id",) + TOUCH_FIELDS
+        })
+        return int(status.split()[-1])
+
+    async def claim_due(self, owner: str, limit: int, now: datetime, lease_until: datetime) -> List[Record]:
+        """
+        Leases up to `limit` files due at `now` to `owner` until `lease_until` and returns
+        their METADATA_COLUMNS rows. Concurrent callers get disjoint sets of files.
+        """
+        return await self._run('fetch', CLAIM_DUE, {
+            "owner": owner, "limit": limit, "now": now, "lease_until": lease_until,
+        })
+
+    async def release(self, owner: str, schedule: Dict[UUID, datetime]) -> int:
+        """
+        Ends `owner`'s leases on the given files, scheduling each at its new next_fetch_at.
+        Files whose lease expired and was taken over by another worker are left alone.
+        Returns the number of leases released.
+        """
+        if not schedule:
+            return 0
+        status = await self._run('execute', RELEASE, {
+            "owner": owner, "ids": list(schedule), "next_fetch_at": list(schedule.values()),
+        })
+        return int(status.split()[-1])
+
+
+repository = JSFileRepository()
@@ -1,15 +1,115 @@
 import asyncio
+import os
 import grpc
 from concurrent import futures
 from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
 from app.db.database import database
-from app.services.js_file_service import JSFileService
+from app.db.repository import repository
+from app.messaging.notifier import relay
+from app.messaging.publisher import publisher
+from app.metrics import MetricsInterceptor, start_metrics_server
+from app.services.fetcher import fetcher
+from app.services.fingerprint import fingerprinter
+from app.services.js_file_service import JSFileService, DEFAULT_PAGE_SIZE
 from protos import js_monitor_pb2
 from protos import js_monitor_pb2_grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 
+# Compression of every response, unless the client negotiated a different one. Content
+# returned already compressed (accept_encodings) is never compressed twice.
+COMPRESSION = {
+    'none': grpc.Compression.NoCompression,
+    'deflate': grpc.Compression.Deflate,
+    'gzip': grpc.Compression.Gzip,
+}[os.getenv('GRPC_COMPRESSION', 'gzip').lower()]
+
+def to_js_file_response(file) -> js_monitor_pb2.JsFileResponse:
+    """
+    Converts a JSFileResponse, or a JSFileProjection limited by a field mask, into its protobuf message.
+    """
+    fields = file.model_fields_set
+    message = js_monitor_pb2.JsFileResponse(id=str(file.id))
+
+    if 'url' in fields:
+        message.url = str(file.url)
+    if 'host' in fields:
+        message.host = file.host
+    if 'content' in fields:
+        if file.content_encoding:
+            message.compressed_content = file.compressed_content
+            message.content_encoding = file.content_encoding
+        else:
+            message.content = file.content or ''
+    if 'priority' in fields and file.priority is not None:
+        message.priority = file.priority
+    if 'company_id' in fields:
+        message.company_id = str(file.company_id)
+    if 'last_fetched' in fields:
+        message.last_fetched.SetInParent()
+        if file.last_fetched:
+            message.last_fetched.FromDatetime(file.last_fetched)
+    if 'last_updated' in fields:
+        message.last_updated.SetInParent()
+        if file.last_updated:
+            message.last_updated.FromDatetime(file.last_updated)
+    return message
+
+def to_js_file_version(version) -> js_monitor_pb2.JsFileVersion:
+    """
+    Converts a JSFileVersionResponse into its protobuf message.
+    """
+    fetched_at_ts = Timestamp()
+    fetched_at_ts.FromDatetime(version.fetched_at)
+    return js_monitor_pb2.JsFileVersion(
+        id=str(version.id),
+        file_id=str(version.file_id),
+        seq=version.seq,
+        fetched_at=fetched_at_ts,
+        content_hash=version.content_hash,
+        size=version.size,
+        stored_size=version.stored_size,
+        is_snapshot=version.is_snapshot,
+    )
+
+def to_host_health(state) -> js_monitor_pb2.HostHealth:
+    """
+    Converts a HostHealthResponse into its protobuf message.
+    """
+    message = js_monitor_pb2.HostHealth(
+        host=state.host,
+        state=js_monitor_pb2.HostHealth.CircuitState.Value(state.state.upper()),
+        rate=state.rate,
+        configured_rate=state.configured_rate,
+        consecutive_failures=state.consecutive_failures,
+        requests=state.requests,
+        failures=state.failures,
+        last_error=state.last_error or '',
+    )
+    if state.blocked_until:
+        message.blocked_until.FromDatetime(state.blocked_until)
+    if state.last_failure_at:
+        message.last_failure_at.FromDatetime(state.last_failure_at)
+    return message
+
+def field_mask_paths(request) -> Optional[List[str]]:
+    """
+    Returns the field names selected by a request's field mask, or None for all fields.
+    """
+    return list(request.field_mask.paths) or None
+
+def accepted_encodings(request, context, fields: Optional[List[str]]) -> List[str]:
+    """
+    Returns the content encodings a listing request accepts. When content is returned
+    precompressed, compressing the response again would only burn CPU, so it is turned off.
+    """
+    encodings = list(request.accept_encodings)
+    if encodings and not request.fetch_content and (fields is None or 'content' in fields):
+        context.set_compression(grpc.Compression.NoCompression)
+    return encodings
+
 class JSMonitorServicer(js_monitor_pb2_grpc.JSMonitorServiceServicer):
     """
     Implements the gRPC service for JSMonitor.
@@ -64,24 +164,29 @@ class JSMonitorServicer(js_monitor_pb2_grpc.JSMonitorServiceServicer):
         if not updated_file:
             await context.abort(grpc.StatusCode.NOT_FOUND, f"File with id {file_id} not found.")
 
-        last_fetched_ts = Timestamp()
-        if updated_file.last_fetched:
-            last_fetched_ts.FromDatetime(updated_file.last_fetched)
-        
-        last_updated_ts = Timestamp()
-        if updated_file.last_updated:
-            last_updated_ts.FromDatetime(updated_file.last_updated)
-
-        return js_monitor_pb2.JsFileResponse(
-            id=str(updated_file.id),
-            url=str(updated_file.url),
-            host=updated_file.host,
-            content=updated_file.content or '',
-            priority=updated_file.priority,
-            company_id=str(updated_file.company_id),
-            last_fetched=last_fetched_ts,
-            last_updated=last_updated_ts,
-        )
+        return to_js_file_response(updated_file)
+
+    async def BatchFetchAndUpdate(self, request, context):
+        """
+        Handles the gRPC call to fetch and update many files, streaming each outcome.
+        """
+        try:
+            file_ids = [UUID(file_id) for file_id in request.file_ids]
+            company_id = UUID(request.company_id) if request.company_id else None
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid file or company ID format.")
+
+        if not file_ids and not company_id:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Provide file_ids and/or company_id.")
+
+        Status = js_monitor_pb2.BatchFetchAndUpdateResult.Status
+        async for refreshed in self.service.batch_refresh(file_ids, company_id):
+            yield js_monitor_pb2.BatchFetchAndUpdateResult(
+                file_id=str(refreshed.file_id),
+                status=Status.Value(refreshed.status.upper()),
+                error=refreshed.error or '',
+                file=to_js_file_response(refreshed.file) if refreshed.file else None,
+            )
 
     async def ListJsFiles(self, request, context):
         """
@@ -89,44 +194,126 @@ class JSMonitorServicer(js_monitor_pb2_grpc.JSMonitorServiceServicer):
         """
         company_id = UUID(request.company_id) if request.company_id else None
         fetch_content = request.fetch_content
+        fields = field_mask_paths(request)
+        encodings = accepted_encodings(request, context, fields)
         
-        if company_id:
-            files = await self.service.list_files_by_company(company_id, fetch_content=fetch_content)
-        else:
-            files = await self.service.list_all_files(fetch_content=fetch_content)
+        try:
+            if company_id:
+                files = await self.service.list_files_by_company(
+                    company_id, fetch_content=fetch_content, fields=fields, accept_encodings=encodings
+                )
+            else:
+                files = await self.service.list_all_files(
+                    fetch_content=fetch_content, fields=fields, accept_encodings=encodings
+                )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         
-        response_files = []
-        for file in files:
-            last_fetched_ts = Timestamp()
-            if file.last_fetched:
-                last_fetched_ts.FromDatetime(file.last_fetched)
-            
-            last_updated_ts = Timestamp()
-            if file.last_updated:
-                last_updated_ts.FromDatetime(file.last_updated)
-            
-            response_files.append(js_monitor_pb2.JsFileResponse(
-                id=str(file.id),
-                url=str(file.url),
-                host=file.host,
-                content=file.content or '',
-                priority=file.priority,
-                company_id=str(file.company_id),
-                last_fetched=last_fetched_ts,
-                last_updated=last_updated_ts,
-            ))
-            
+        response_files = [to_js_file_response(file) for file in files]
         return js_monitor_pb2.ListJsFilesResponse(files=response_files)
 
+    async def StreamJsFiles(self, request, context):
+        """
+        Handles the gRPC call to stream JS files page by page.
+        """
+        try:
+            company_id = UUID(request.company_id) if request.company_id else None
+            after = UUID(request.after_id) if request.after_id else None
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid company or file ID format.")
+
+        page_size = request.page_size or DEFAULT_PAGE_SIZE
+        fields = field_mask_paths(request)
+        try:
+            files = self.service.iter_files(
+                company_id,
+                after=after,
+                page_size=page_size,
+                fields=fields,
+                fetch_content=request.fetch_content,
+                accept_encodings=accepted_encodings(request, context, fields),
+            )
+            async for file in files:
+                yield to_js_file_response(file)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    async def ListJsFileVersions(self, request, context):
+        """
+        Handles the gRPC call to list the stored versions of a file.
+        """
+        try:
+            file_id = UUID(request.file_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid file ID format.")
+
+        versions = await self.service.list_versions(file_id)
+        return js_monitor_pb2.ListJsFileVersionsResponse(
+            versions=[to_js_file_version(version) for version in versions]
+        )
+
+    async def GetJsFileVersion(self, request, context):
+        """
+        Handles the gRPC call to fetch a reconstructed version of a file.
+        """
+        try:
+            version_id = UUID(request.version_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid version ID format.")
+
+        result = await self.service.get_version(version_id)
+        if not result:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Version with id {version_id} not found.")
+
+        return js_monitor_pb2.GetJsFileVersionResponse(
+            version=to_js_file_version(result.version),
+            content=result.content,
+        )
+
+    async def DiffJsFileVersions(self, request, context):
+        """
+        Handles the gRPC call to diff two stored versions.
+        """
+        try:
+            from_version_id = UUID(request.from_version_id)
+            to_version_id = UUID(request.to_version_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid version ID format.")
+
+        context_lines = request.context_lines if request.HasField('context_lines') else 3
+        result = await self.service.diff_versions(from_version_id, to_version_id, context_lines)
+        if not result:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "One or both versions were not found.")
+
+        return js_monitor_pb2.DiffJsFileVersionsResponse(
+            from_version=to_js_file_version(result.from_version),
+            to_version=to_js_file_version(result.to_version),
+            diff=result.diff,
+        )
+
+    async def GetHostHealth(self, request, context):
+        """
+        Handles the gRPC call to report the health of fetched hosts.
+        """
+        states = self.service.host_health(list(request.hosts) or None, request.unhealthy_only)
+        return js_monitor_pb2.GetHostHealthResponse(hosts=[to_host_health(state) for state in states])
+
 async def serve():
     """
     Main function to run the gRPC server.
     """
-    server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.aio.server(
+        futures.ThreadPoolExecutor(max_workers=10),
+        interceptors=[MetricsInterceptor()],
+        compression=COMPRESSION,
+    )
     js_monitor_pb2_grpc.add_JSMonitorServiceServicer_to_server(JSMonitorServicer(), server)
     server.add_insecure_port('[::]:50051')
     
     await database.connect()
+    await repository.connect()
+    await publisher.start()
+    start_metrics_server()
     
     print("gRPC server starting on port 50051...")
     await server.start()
@@ -136,4 +323,9 @@ async def serve():
     except KeyboardInterrupt:
         print("Shutting down gRPC server...")
     finally:
+        await relay.close()
+        await publisher.stop()
+        await fetcher.aclose()
+        fingerprinter.close()
+        await repository.close()
         await database.disconnect()
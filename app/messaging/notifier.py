@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.db.database import database
+from app.messaging.publisher import Publisher, publisher as shared_publisher
+from app.metrics import CHANGE_NOTIFICATIONS
+from app.models.js_file_model import js_change_outbox
+
+NOTIFY_QUEUE = os.getenv('NOTIFY_QUEUE', 'file_changes')
+# Seconds between polls of an empty outbox. Changes written in between are relayed
+# together, so this is also the window repeated changes of a file are coalesced in.
+NOTIFY_WINDOW = float(os.getenv('NOTIFY_WINDOW', '2.0'))
+# Outbox rows relayed per transaction, and files per published message.
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '5000'))
+NOTIFY_BATCH_SIZE = int(os.getenv('NOTIFY_BATCH_SIZE', '500'))
+# How long sent rows are kept for inspection before being deleted.
+OUTBOX_RETENTION = timedelta(hours=float(os.getenv('OUTBOX_RETENTION_HOURS', '24')))
+# pg_advisory_xact_lock key held while relaying, so only one relay sends at a time and in order.
+OUTBOX_LOCK_KEY = 7_305_418_261
+
+
+async def enqueue_change(change: dict):
+    """
+    Writes a change notification to the outbox. Call it inside the transaction that
+    stores the change, so the notification exists if and only if the change does, and
+    count it as queued once that transaction has committed.
+    `change` holds at least file_id, company_id and change_found_at.
+    """
+    await database.execute(js_change_outbox.insert().values(
+        file_id=change["file_id"],
+        company_id=change["company_id"],
+        payload=json.dumps(change),
+        created_at=datetime.now(),
+    ))
+
+
+def coalesce_changes(changes: List[dict]) -> List[dict]:
+    """
+    Merges repeated changes of the same file into its latest one, keeping when the
+    first one was found and how many there were. Changes must be in the order found.
+    """
+    merged: Dict[str, dict] = {}
+    for change in changes:
+        previous = merged.get(change["file_id"])
+        if previous is None:
+            merged[change["file_id"]] = {**change, "first_change_found_at": change["change_found_at"], "changes": 1}
+            continue
+        merged[change["file_id"]] = {
+            **change,
+            "first_change_found_at": previous["first_change_found_at"],
+            "changes": previous["changes"] + 1,
+            # Cosmetic only if every coalesced change was.
+            "cosmetic": previous.get("cosmetic", False) and change.get("cosmetic", False),
+        }
+        CHANGE_NOTIFICATIONS.labels('coalesced').inc()
+    return list(merged.values())
+
+
+def company_messages(changes: List[dict], batch_size: int = NOTIFY_BATCH_SIZE) -> List[dict]:
+    """
+    Groups changes into one message per company, split every `batch_size` files:
+
+        {"company_id": ..., "changes": [{"file_id": ..., "url": ..., "change_found_at": ...,
+         "first_change_found_at": ..., "changes": 2, ...}], "flushed_at": ...}
+    """
+    by_company = defaultdict(list)
+    for change in changes:
+        change = dict(change)
+        by_company[change.pop("company_id")].append(change)
+
+    flushed_at = str(datetime.now())
+    return [
+        {"company_id": company_id, "changes": files[start:start + batch_size], "flushed_at": flushed_at}
+        for company_id, files in by_company.items()
+        for start in range(0, len(files), batch_size)
+    ]
+
+
+class OutboxRelay:
+    """
+    Relays the js_change_outbox to RabbitMQ.
+
+    Each pass takes up to OUTBOX_BATCH_SIZE unsent rows in id order, coalesces them per
+    file, publishes one message per company and waits for the broker confirms, then marks
+    the rows sent with a single UPDATE in the same transaction. A crash or a failed publish
+    leaves the rows unsent for the next pass, so delivery is at-least-once and nothing is
+    lost. An advisory lock lets every node run a relay while only one of them sends at a time.
+    """
+
+    def __init__(self, publisher: Optional[Publisher] = None, queue_name: str = NOTIFY_QUEUE,
+                 window: float = NOTIFY_WINDOW, batch_size: int = OUTBOX_BATCH_SIZE,
+                 message_size: int = NOTIFY_BATCH_SIZE, retention: timedelta = OUTBOX_RETENTION):
+        self.publisher = publisher or shared_publisher
+        self.queue_name = queue_name
+        self.window = window
+        self.batch_size = batch_size
+        self.message_size = message_size
+        self.retention = retention
+
+    async def relay_once(self) -> int:
+        """
+        Relays one batch of unsent rows. Returns the number of rows marked sent, or -1
+        if another relay holds the lock.
+        """
+        async with database.transaction():
+            locked = await database.fetch_val(select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_KEY)))
+            if not locked:
+                return -1
+            rows = await database.fetch_all(
+                select(js_change_outbox.c.id, js_change_outbox.c.payload)
+                .where(js_change_outbox.c.sent_at.is_(None))
+                .order_by(js_change_outbox.c.id)
+                .limit(self.batch_size)
+            )
+            if not rows:
+                return 0
+
+            changes = coalesce_changes([json.loads(row.payload) for row in rows])
+            messages = company_messages(changes, self.message_size)
+            if not await self.publisher.publish_confirmed(self.queue_name, messages):
+                CHANGE_NOTIFICATIONS.labels('failed').inc(len(changes))
+                raise RuntimeError(f"RabbitMQ did not confirm {len(messages)} change messages")
+
+            await database.execute(
+                js_change_outbox.update()
+                .where(js_change_outbox.c.id.in_([row.id for row in rows]))
+                .values(sent_at=datetime.now())
+            )
+        CHANGE_NOTIFICATIONS.labels('published').inc(len(changes))
+        return len(rows)
+
+    async def prune(self) -> int:
+        """
+        Deletes rows sent more than `retention` ago. Returns the number deleted.
+        """
+        deleted = await database.fetch_all(
+            js_change_outbox.delete()
+            .where(js_change_outbox.c.sent_at < datetime.now() - self.retention)
+            .returning(js_change_outbox.c.id)
+        )
+        return len(deleted)
+
+    async def run(self):
+        """
+        Relays the outbox until cancelled, pruning old rows about once an hour.
+        """
+        print("Outbox relay starting...")
+        last_pruned = datetime.now()
+        while True:
+            try:
+                relayed = await self.relay_once()
+                if datetime.now() - last_pruned > timedelta(hours=1):
+                    await self.prune()
+                    last_pruned = datetime.now()
+            except Exception as e:
+                print(f"Error relaying change outbox: {e}")
+                relayed = 0
+            if relayed < self.batch_size:
+                # A full batch means there is a backlog, so only wait when caught up.
+                await asyncio.sleep(self.window)
+
+    async def close(self):
+        """
+        Relays what is already in the outbox, so a clean shutdown leaves nothing for the next start.
+        """
+        try:
+            while await self.relay_once() == self.batch_size:
+                pass
+        except Exception as e:
+            print(f"Error relaying change outbox on shutdown, rows are kept for the next relay: {e}")
+
+
+relay = OutboxRelay()
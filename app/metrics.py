@@ -0,0 +1,166 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import grpc
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+METRICS_ADDR = os.getenv('METRICS_ADDR', '127.0.0.1')
+
+# Buckets from 5 ms to 30 s, covering both cached CDN hits and large slow bundles.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+FETCH_LATENCY = Histogram(
+    'jsmon_fetch_duration_seconds', 'Time to download a JS file, per host.',
+    ['host'], buckets=LATENCY_BUCKETS,
+)
+FETCH_WAIT = Histogram(
+    'jsmon_fetch_queue_seconds', 'Time a fetch waited for a global or per-host concurrency slot.',
+    buckets=LATENCY_BUCKETS,
+)
+FETCHES_IN_FLIGHT = Gauge('jsmon_fetches_in_flight', 'Fetches currently downloading.')
+FETCH_ERRORS = Counter('jsmon_fetch_errors_total', 'Failed fetches, per host and reason.', ['host', 'reason'])
+BYTES_DOWNLOADED = Counter('jsmon_downloaded_bytes_total', 'Response body bytes received on the wire (before decompression), per host.', ['host'])
+
+REFRESHES = Counter(
+    'jsmon_refreshes_total',
+    'Refresh outcomes: changed, cosmetic (changed with the same semantic fingerprint), not_modified (304),'
+    ' same_hash (body matched the stored digest), superseded (a concurrent refresh stored a change first) or error.',
+    ['result'],
+)
+
+DB_LATENCY = Histogram(
+    'jsmon_db_query_duration_seconds', 'Database query latency, per statement type and table.',
+    ['operation'], buckets=DB_BUCKETS,
+)
+
+GRPC_LATENCY = Histogram(
+    'jsmon_grpc_handler_duration_seconds', 'gRPC handler latency, per method and status code.',
+    ['method', 'code'], buckets=LATENCY_BUCKETS,
+)
+
+CONSUME_LAG = Histogram(
+    'jsmon_consume_lag_seconds', 'Delay between a message being published and consumed, per queue.',
+    ['queue'], buckets=LAG_BUCKETS,
+)
+CONSUMED_MESSAGES = Counter('jsmon_consumed_messages_total', 'Queue messages handled, per outcome.', ['outcome'])
+CHANGE_NOTIFICATIONS = Counter(
+    'jsmon_change_notifications_total',
+    'Change notifications: queued (outbox row committed), coalesced (merged into a later change of the same file'
+    ' when relayed), published (confirmed by RabbitMQ) or failed (not confirmed, left in the outbox for a retry).',
+    ['outcome'],
+)
+PUBLISHED_MESSAGES = Counter('jsmon_published_messages_total', 'Messages published, per queue and outcome.',
+                             ['queue', 'outcome'])
+
+_server_started = False
+
+
+def start_metrics_server(port: Optional[int] = None, addr: Optional[str] = None):
+    """
+    Exposes the metrics in the Prometheus text format on a local port. Safe to call more than once.
+    """
+    global _server_started
+    if _server_started:
+        return
+    port = port or METRICS_PORT
+    addr = addr or METRICS_ADDR
+    start_http_server(port, addr=addr)
+    _server_started = True
+    print(f"Metrics available on http://{addr}:{port}/metrics")
+
+
+def observe_consume_lag(queue_name: str, published_at: Optional[datetime]):
+    """
+    Records consume lag from a message's AMQP timestamp, when the producer set one.
+    """
+    if published_at is None:
+        return
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    lag = time.time() - published_at.timestamp()
+    CONSUME_LAG.labels(queue_name).observe(max(lag, 0.0))
+
+
+def query_operation(query) -> str:
+    """
+    Labels a query with its statement type and main table, e.g. "update js_files".
+    """
+    if isinstance(query, str):
+        return query.split(None, 1)[0].lower() if query.strip() else "raw"
+    kind = getattr(query, '__visit_name__', 'query')
+    table = getattr(query, 'table', None)
+    if table is None:
+        froms = query.get_final_froms() if hasattr(query, 'get_final_froms') else []
+        table = froms[0] if froms else None
+        # Joins are labelled by their leftmost table.
+        while table is not None and hasattr(table, 'left'):
+            table = table.left
+    name = getattr(table, 'name', None)
+    return f"{kind} {name}" if name else kind
+
+
+class MetricsInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Times every gRPC handler, including server-streaming ones until their last message.
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+
+        if handler.unary_unary:
+            inner = handler.unary_unary
+
+            async def unary_unary(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    response = await inner(request, context)
+                    code = context.code() or grpc.StatusCode.OK
+                    return response
+                except BaseException:
+                    code = context.code() or grpc.StatusCode.UNKNOWN
+                    raise
+                finally:
+                    GRPC_LATENCY.labels(method, _code_name(code)).observe(time.perf_counter() - start)
+
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        if handler.unary_stream:
+            inner = handler.unary_stream
+
+            async def unary_stream(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    async for response in inner(request, context):
+                        yield response
+                    code = context.code() or grpc.StatusCode.OK
+                except BaseException:
+                    code = context.code() or grpc.StatusCode.UNKNOWN
+                    raise
+                finally:
+                    GRPC_LATENCY.labels(method, _code_name(code)).observe(time.perf_counter() - start)
+
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        return handler
+
+
+def _code_name(code) -> str:
+    return code.name if isinstance(code, grpc.StatusCode) else str(code)
@@ -1,5 +1,5 @@
 import sqlalchemy
-from sqlalchemy import Table, Column, Integer, DateTime, Text
+from sqlalchemy import Table, Column, UniqueConstraint, Index, Boolean, Integer, BigInteger, DateTime, Float, Text, LargeBinary, func
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
 
@@ -16,5 +16,83 @@ js_files = Table(
     Column("company_id", UUID(as_uuid=True), nullable=False),
     Column("last_fetched", DateTime),
     Column("last_updated", DateTime),
+    Column("etag", Text),
+    Column("last_modified", Text),
+    Column("content_length", BigInteger),
+    Column("content_hash", Text),
+    # Fingerprint of the content ignoring cosmetic differences (see app.services.fingerprint).
+    Column("semantic_hash", Text),
+    # Lease-based work distribution: when the file is due next, and which worker holds it until when.
+    Column("next_fetch_at", DateTime),
+    Column("lease_owner", Text),
+    Column("lease_expires_at", DateTime),
+    # Decayed fetch history feeding the change-rate estimate (see app.services.revisit).
+    Column("change_observations", Float),
+    Column("change_detections", Float),
+    Column("observed_seconds", Float),
+    Column("change_rate", Float),
+    UniqueConstraint("company_id", "url", name="uq_js_files_company_url"),
+    Index("ix_js_files_company_id_id", "company_id", "id"),
+    Index("ix_js_files_host", "host"),
+    Index("ix_js_files_last_updated", "last_updated"),
 )
+# What is due next for a priority: never fetched first, then the stalest.
+Index("ix_js_files_due", js_files.c.priority, js_files.c.last_fetched.asc().nulls_first())
+# Due files in claim order; files never scheduled (NULL) come first.
+Index("ix_js_files_next_fetch_at", js_files.c.next_fetch_at.asc().nulls_first())
+
+# Content-addressed store for file bodies, shared by every js_files row whose content_hash matches.
+js_blobs = Table(
+    "js_blobs",
+    metadata,
+    Column("hash", Text, primary_key=True),
+    Column("data", LargeBinary, nullable=False),
+    Column("encoding", Text, nullable=False),
+    Column("size", BigInteger, nullable=False),
+    Column("compressed_size", BigInteger, nullable=False),
+    Column("refcount", Integer, nullable=False, server_default="0"),
+    Column("created_at", DateTime),
+)
+Index("ix_js_blobs_unreferenced", js_blobs.c.hash, postgresql_where=js_blobs.c.refcount <= 0)
+
+# Content history of each file. Versions are grouped in chains that start with a full
+# snapshot, each later version being stored as a delta against its predecessor.
+js_file_versions = Table(
+    "js_file_versions",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid4),
+    Column("file_id", UUID(as_uuid=True), nullable=False),
+    Column("seq", Integer, nullable=False),
+    Column("fetched_at", DateTime, nullable=False),
+    Column("content_hash", Text, nullable=False),
+    Column("size", BigInteger, nullable=False),
+    Column("is_snapshot", Boolean, nullable=False),
+    Column("snapshot_id", UUID(as_uuid=True), nullable=False),
+    Column("encoding", Text, nullable=False),
+    Column("data", LargeBinary, nullable=False),
+    UniqueConstraint("file_id", "seq", name="uq_js_file_versions_file_seq"),
+    Index("ix_js_file_versions_snapshot_seq", "snapshot_id", "seq"),
+)
+
+# Change notifications written in the same transaction as the content update, and
+# relayed to RabbitMQ by app.messaging.notifier.OutboxRelay.
+js_change_outbox = Table(
+    "js_change_outbox",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("file_id", UUID(as_uuid=True), nullable=False),
+    Column("company_id", UUID(as_uuid=True), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("sent_at", DateTime),
+)
+Index("ix_js_change_outbox_unsent", js_change_outbox.c.id, postgresql_where=js_change_outbox.c.sent_at.is_(None))
+
+
+def sha256_hex(column):
+    """
+    SQL expression computing the hex SHA-256 of a text column, matching the
+    digests the fetcher computes for UTF-8 bodies.
+    """
+    return func.encode(func.sha256(func.convert_to(column, 'UTF8')), 'hex')
 
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, AnyUrl, Field, field_validator
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class JSFileCreate(BaseModel):
@@ -33,3 +33,92 @@ class JSFileResponse(BaseModel):
     company_id: UUID
     last_fetched: Optional[datetime]
     last_updated: Optional[datetime]
+    # Stored content still compressed, set instead of `content` when the caller accepts
+    # its encoding. Never serialised to JSON; REST clients use /js-files/{id}/content.
+    compressed_content: Optional[bytes] = Field(None, exclude=True)
+    content_encoding: Optional[str] = Field(None, exclude=True)
+
+# Field names accepted in field masks / `fields=` projections.
+JS_FILE_FIELDS = tuple(name for name, info in JSFileResponse.model_fields.items() if not info.exclude)
+
+class JSFileProjection(BaseModel):
+    """
+    Pydantic model for a JS file limited to the fields selected with a field mask.
+    Only the selected fields are set; `id` is always included.
+    """
+    id: UUID
+    url: Optional[AnyUrl] = None
+    host: Optional[str] = None
+    content: Optional[str] = None
+    priority: Optional[int] = None
+    company_id: Optional[UUID] = None
+    last_fetched: Optional[datetime] = None
+    last_updated: Optional[datetime] = None
+    compressed_content: Optional[bytes] = Field(None, exclude=True)
+    content_encoding: Optional[str] = Field(None, exclude=True)
+
+class JSFilePage(BaseModel):
+    """
+    Pydantic model for one page of a keyset-paginated file listing.
+    """
+    items: List[JSFileProjection]
+    next_cursor: Optional[UUID]
+
+class JSFileBatchFetchRequest(BaseModel):
+    """
+    Pydantic model for refreshing many files at once, by ID and/or company.
+    """
+    file_ids: List[UUID] = []
+    company_id: Optional[UUID] = None
+
+class JSFileBatchFetchResult(BaseModel):
+    """
+    Pydantic model for the outcome of refreshing one file in a batch.
+    """
+    file_id: UUID
+    status: str
+    error: Optional[str] = None
+    file: Optional[JSFileResponse] = None
+
+class JSFileVersionResponse(BaseModel):
+    """
+    Pydantic model for one stored version of a JS file.
+    """
+    id: UUID
+    file_id: UUID
+    seq: int
+    fetched_at: datetime
+    content_hash: str
+    size: int
+    stored_size: int
+    is_snapshot: bool
+
+class JSFileVersionContent(BaseModel):
+    """
+    Pydantic model for a reconstructed version of a JS file.
+    """
+    version: JSFileVersionResponse
+    content: str
+
+class JSFileVersionDiff(BaseModel):
+    """
+    Pydantic model for a unified diff between two versions of a JS file.
+    """
+    from_version: JSFileVersionResponse
+    to_version: JSFileVersionResponse
+    diff: str
+
+class HostHealthResponse(BaseModel):
+    """
+    Pydantic model for the politeness and circuit breaker state of one fetched host.
+    """
+    host: str
+    state: str
+    rate: float
+    configured_rate: float
+    consecutive_failures: int
+    blocked_until: Optional[datetime]
+    requests: int
+    failures: int
+    last_error: Optional[str]
+    last_failure_at: Optional[datetime]
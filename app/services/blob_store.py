@@ -0,0 +1,157 @@
+import asyncio
+import os
+import zlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.database import database
+from app.models.js_file_model import js_blobs
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_LEVEL = int(os.getenv('BLOB_ZSTD_LEVEL', '9'))
+DEFLATE_LEVEL = 6
+
+
+def compress(data: bytes) -> Tuple[bytes, str]:
+    """
+    Compresses a blob with zstd when the `zstandard` package is installed, falling
+    back to zlib otherwise. Returns the compressed bytes and their encoding.
+    """
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), 'zstd'
+    return zlib.compress(data, DEFLATE_LEVEL), 'deflate'
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """
+    Reverses compress() for the given encoding.
+    """
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == 'deflate':
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown blob encoding: {encoding}")
+
+
+def decode_blob(data: Optional[bytes], encoding: Optional[str]) -> Optional[str]:
+    """
+    Turns a stored blob back into the file's text.
+    """
+    if data is None:
+        return None
+    return decompress(data, encoding).decode('utf-8')
+
+
+class BlobStore:
+    """
+    Content-addressed, compressed store for JS file bodies.
+
+    Blobs are keyed by the SHA-256 of their content and reference counted, so identical
+    bundles tracked by many companies are stored once and pointing a file at content that
+    is already stored only bumps a counter.
+    """
+
+    async def prepare(self, content_hash: str, content: str) -> Optional[Tuple[bytes, str, int]]:
+        """
+        Compresses content off the event loop, unless a blob for content_hash is already
+        stored. Returns the (data, encoding, size) to pass to put(), or None.
+        Call it before opening the transaction that calls put(), so no compression
+        happens while that transaction holds its locks and connection.
+        """
+        stored = await database.fetch_val(select(js_blobs.c.hash).where(js_blobs.c.hash == content_hash))
+        if stored is not None:
+            return None
+        raw = content.encode('utf-8')
+        data, encoding = await asyncio.to_thread(compress, raw)
+        return data, encoding, len(raw)
+
+    async def put(self, content_hash: str, content: str,
+                  prepared: Optional[Tuple[bytes, str, int]] = None) -> bool:
+        """
+        Takes a reference to the blob for content_hash, storing the content if it is new.
+        `prepared` is the output of prepare(); without it, new content is compressed here.
+        Returns True if a new blob was written.
+        """
+        bumped = await database.fetch_one(
+            js_blobs.update()
+            .where(js_blobs.c.hash == content_hash)
+            .values(refcount=js_blobs.c.refcount + 1)
+            .returning(js_blobs.c.hash)
+        )
+        if bumped:
+            return False
+
+        if prepared is None:
+            raw = content.encode('utf-8')
+            data, encoding = await asyncio.to_thread(compress, raw)
+            prepared = data, encoding, len(raw)
+        data, encoding, size = prepared
+        query = insert(js_blobs).values(
+            hash=content_hash,
+            data=data,
+            encoding=encoding,
+            size=size,
+            compressed_size=len(data),
+            refcount=1,
+            created_at=datetime.now(),
+        )
+        # Another writer may have stored the same content in the meantime.
+        query = query.on_conflict_do_update(
+            index_elements=[js_blobs.c.hash],
+            set_={"refcount": js_blobs.c.refcount + 1},
+        )
+        await database.execute(query)
+        return True
+
+    async def release(self, content_hash: Optional[str]):
+        """
+        Drops a reference to a blob and deletes it once nothing points at it.
+        """
+        if not content_hash:
+            return
+        remaining = await database.fetch_one(
+            js_blobs.update()
+            .where(js_blobs.c.hash == content_hash)
+            .values(refcount=js_blobs.c.refcount - 1)
+            .returning(js_blobs.c.refcount)
+        )
+        if remaining is not None and remaining.refcount <= 0:
+            # Re-checked in the DELETE so a concurrent put() that revived the blob wins.
+            await database.execute(
+                js_blobs.delete()
+                .where(js_blobs.c.hash == content_hash)
+                .where(js_blobs.c.refcount <= 0)
+            )
+
+    async def get(self, content_hash: str) -> Optional[str]:
+        """
+        Returns the decompressed content stored for content_hash, if any.
+        """
+        record = await database.fetch_one(
+            select(js_blobs.c.data, js_blobs.c.encoding).where(js_blobs.c.hash == content_hash)
+        )
+        if not record:
+            return None
+        return decode_blob(record.data, record.encoding)
+
+    async def collect_garbage(self) -> int:
+        """
+        Deletes blobs left without references (e.g. after a crash between release steps).
+        Returns the number of blobs removed.
+        """
+        deleted = await database.fetch_all(
+            js_blobs.delete().where(js_blobs.c.refcount <= 0).returning(js_blobs.c.hash)
+        )
+        return len(deleted)
+
+
+blob_store = BlobStore()
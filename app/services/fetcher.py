@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from app.metrics import BYTES_DOWNLOADED, FETCH_ERRORS, FETCH_LATENCY, FETCH_WAIT, FETCHES_IN_FLIGHT
+from app.services.host_health import CLOSED, HostHealthRegistry, parse_retry_after
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+try:
+    import zstandard  # noqa: F401
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Content codings offered to origins, best ratio first. httpx decodes br and zstd only
+# when the `brotli` / `zstandard` packages are installed, so they are offered only then.
+ACCEPT_ENCODING = ", ".join(
+    (["zstd"] if ZSTD_AVAILABLE else []) + (["br"] if BROTLI_AVAILABLE else []) + ["gzip", "deflate"]
+)
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of a successful (2xx or 304) fetch, with the validators needed to revalidate it later.
+
+    The body is kept as the raw bytes received; it is only decoded to text when
+    `content` is first read, so callers that just compare digests never pay for it.
+    """
+    status_code: int
+    body: Optional[bytes] = field(default=None, repr=False)
+    charset: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    content_hash: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+    @cached_property
+    def content(self) -> Optional[str]:
+        if self.body is None:
+            return None
+        return self.body.decode(self.charset or 'utf-8', errors='replace')
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches DNS lookups so connections to the same CDN hosts
+    don't pay for a resolver round trip every time.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addresses = await self._resolve(host, port)
+        last_error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed, so the next attempt should resolve again.
+        self._cache.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"Could not resolve {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """
+    httpx transport backed by a connection pool that uses the caching DNS backend.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool, network_backend: httpcore.AsyncNetworkBackend):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+
+class JSFetcher:
+    """
+    Long-lived HTTP client shared by every JSFileService instance.
+
+    Connections are pooled and kept alive, HTTP/2 is used when the `h2` package is
+    installed, and fetches are bounded by a global and a per-host concurrency cap.
+    Bodies are streamed and abandoned once they exceed max_bytes.
+
+    Each host is also rate limited and tracked by a HostHealth: a host that fails is
+    backed off and eventually fast-failed by its circuit breaker. Requests wait for their
+    host's rate or short backoffs before taking a concurrency slot, so a slow or sick host
+    never holds slots that healthy hosts could use.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_per_host: Optional[int] = None,
+                 timeout: Optional[float] = None, dns_ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, hosts: Optional[HostHealthRegistry] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv('FETCH_MAX_CONCURRENCY', '200'))
+        self.max_per_host = max_per_host or int(os.getenv('FETCH_MAX_PER_HOST', '20'))
+        self.timeout = timeout or float(os.getenv('FETCH_TIMEOUT', '10'))
+        self.dns_ttl = dns_ttl or float(os.getenv('FETCH_DNS_TTL', '300'))
+        self.max_bytes = max_bytes or int(os.getenv('FETCH_MAX_BYTES', str(32 * 1024 * 1024)))
+        # Longest a request waits for its host's rate limit, and for a backoff to end,
+        # before failing instead.
+        self.max_rate_wait = float(os.getenv('FETCH_MAX_RATE_WAIT', '60'))
+        self.max_backoff_wait = float(os.getenv('FETCH_MAX_BACKOFF_WAIT', '5'))
+        self.hosts = hosts or HostHealthRegistry()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The underlying client, created on first use so it binds to the running event loop.
+        """
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60.0,
+            )
+            transport = PooledTransport(limits, HTTP2_AVAILABLE, CachingDNSBackend(self.dns_ttl))
+            self._client = httpx.AsyncClient(
+                transport=transport,
+                follow_redirects=True,
+                timeout=self.timeout,
+            )
+        return self._client
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(self.max_per_host)
+            self._host_limits[host] = limit
+        return limit
+
+    async def fetch_conditional(self, url: str, host: Optional[str] = None, etag: Optional[str] = None,
+                                last_modified: Optional[str] = None) -> Optional[FetchResult]:
+        """
+        Fetches a JavaScript file, revalidating with If-None-Match / If-Modified-Since when
+        validators from a previous fetch are given. A 304 answer yields a result without content.
+        Returns None on any HTTP or network error, or when the body is larger than max_bytes.
+        Also returns None right away while the host is backed off or its circuit is open.
+        """
+        host = host or url.split('/')[2]
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        queued_at = time.perf_counter()
+        health = self.hosts.get(host)
+        blocked_for = health.blocked_for()
+        if 0 < blocked_for <= self.max_backoff_wait and health.state == CLOSED:
+            await asyncio.sleep(blocked_for)
+        refusal = health.admit(probe_timeout=self.timeout * 2)
+        if refusal is None:
+            delay = health.reserve(self.max_rate_wait)
+            if delay is None:
+                refusal = 'rate_limited'
+            elif delay:
+                await asyncio.sleep(delay)
+        if refusal is not None:
+            FETCH_ERRORS.labels(host, refusal).inc()
+            return None
+
+        async with self._global_limit, self._host_limit(host):
+            started_at = time.perf_counter()
+            FETCH_WAIT.observe(started_at - queued_at)
+            FETCHES_IN_FLIGHT.inc()
+            try:
+                result = await self._download(url, host, headers, etag, last_modified)
+                if result is not None:
+                    # An oversized body says nothing about the host's health either way.
+                    health.record_success()
+                return result
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                print(f"HTTP Error fetching {url}: {status}")
+                FETCH_ERRORS.labels(host, str(status)).inc()
+                if status == 429 or status >= 500:
+                    health.record_failure(str(status), parse_retry_after(e.response.headers.get('Retry-After')),
+                                          throttled=status == 429)
+                else:
+                    # A 404 or 403 is about the file, not the host, which answered fine.
+                    health.record_success()
+                return None
+            except httpx.RequestError as e:
+                print(f"Request Error fetching {url}: {e}")
+                FETCH_ERRORS.labels(host, type(e).__name__).inc()
+                health.record_failure(type(e).__name__)
+                return None
+            finally:
+                FETCHES_IN_FLIGHT.dec()
+                FETCH_LATENCY.labels(host).observe(time.perf_counter() - started_at)
+
+    async def _download(self, url: str, host: str, headers: Dict[str, str], etag: Optional[str],
+                        last_modified: Optional[str]) -> Optional[FetchResult]:
+        async with self.client.stream('GET', url, headers=headers) as response:
+            if response.status_code == 304:
+                return FetchResult(
+                    status_code=304,
+                    etag=response.headers.get('ETag', etag),
+                    last_modified=response.headers.get('Last-Modified', last_modified),
+                )
+            response.raise_for_status()
+
+            declared_length = response.headers.get('Content-Length')
+            if declared_length and declared_length.isdigit() and int(declared_length) > self.max_bytes:
+                print(f"Skipping {url}: declared size {declared_length} bytes exceeds {self.max_bytes}")
+                FETCH_ERRORS.labels(host, 'too_large').inc()
+                return None
+
+            # Hash the body while it streams in so callers can detect changes by digest.
+            # httpx decodes the content coding; max_bytes applies to the decoded body.
+            digest = hashlib.sha256()
+            body = bytearray()
+            downloaded = BYTES_DOWNLOADED.labels(host)
+            counted = 0
+            async for chunk in response.aiter_bytes():
+                downloaded.inc(response.num_bytes_downloaded - counted)
+                counted = response.num_bytes_downloaded
+                if len(body) + len(chunk) > self.max_bytes:
+                    print(f"Skipping {url}: body exceeds {self.max_bytes} bytes")
+                    FETCH_ERRORS.labels(host, 'too_large').inc()
+                    return None
+                digest.update(chunk)
+                body += chunk
+
+            return FetchResult(
+                status_code=response.status_code,
+                body=bytes(body),
+                charset=response.charset_encoding,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                content_length=len(body),
+                content_hash=digest.hexdigest(),
+            )
+
+    async def aclose(self):
+        """
+        Closes pooled connections.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+fetcher = JSFetcher()
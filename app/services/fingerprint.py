@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Ignore rules applied while normalising the token stream:
+#   comments     - drop every comment (licence banners, build stamps, ...)
+#   source_maps  - drop `//# sourceMappingURL=` comments, for when comments are kept
+#   build_hashes - mask content hashes in asset file names, e.g. "main.3f2a1b9c.js" or "index-BzX9_a1c.js"
+#   timestamps   - mask ISO date-times in strings, e.g. a "2024-05-01T12:00:00Z" build stamp
+#   chunk_ids    - renumber the ids of webpack module maps and of the require calls inside them
+#                  in order of first appearance
+RULES = ("comments", "source_maps", "build_hashes", "timestamps", "chunk_ids")
+DEFAULT_RULES = tuple(
+    rule.strip() for rule in os.getenv('FINGERPRINT_RULES', ','.join(RULES)).split(',') if rule.strip()
+)
+# Extra regular expressions, as a JSON list; matches inside any token are masked.
+DEFAULT_PATTERNS = tuple(json.loads(os.getenv('FINGERPRINT_IGNORE_PATTERNS', '[]')))
+
+# Worker processes for bodies of at least FINGERPRINT_PROCESS_BYTES characters; smaller
+# ones are fingerprinted on a thread. 0 keeps everything on threads.
+FINGERPRINT_WORKERS = int(os.getenv('FINGERPRINT_WORKERS', str(min(os.cpu_count() or 1, 4))))
+FINGERPRINT_PROCESS_BYTES = int(os.getenv('FINGERPRINT_PROCESS_BYTES', str(64 * 1024)))
+
+# Whitespace is folded into the following token. Alternatives are ordered by frequency in
+# minified code; `/` is matched on its own so the caller can tell division from a regex.
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<name>(?:[^\W\d]|\$)[\w$]*)
+  | (?P<punct>[(){}\[\];,:]|=(?![=>])|\.(?![.\d])|>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=
+              |&&|\|\||\?\?|\?\.|\+\+|--|[-+*%&|^]=|<<|>>|\*\*|[^\s/'"`\d.])
+  | (?P<number>0[xXbBoO][0-9a-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?)
+  | (?P<string>"(?:[^"\\\n]|\\[\s\S])*"|'(?:[^'\\\n]|\\[\s\S])*'|`(?:[^`\\]|\\[\s\S])*`)
+  | (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<slash>/=?)
+)""", re.VERBOSE)
+_REGEX = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+# A `/` after these is a division; anywhere else it starts a regular expression literal.
+_DIVISION_AFTER = {"number", "string", "regex"}
+_DIVISION_AFTER_PUNCT = {")", "]", "}"}
+_KEYWORDS_BEFORE_EXPRESSION = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                               "throw", "case", "do", "else", "yield", "await"}
+
+_SOURCE_MAP = re.compile(r"^//[#@]\s*source(?:Mapping)?URL=")
+# Hashes are only masked in asset file names: a hex hash with letters and digits, or an
+# 8 character base64url hash that is not a plain word, right before an asset extension.
+_ASSET_EXTENSION = r"(?=(?:\.[\w-]+)?\.(?:m?js|css|map|json|wasm)\b)"
+_HEX_HASH = re.compile(r"(?<=[-.~/])(?=[0-9a-f]*[0-9])(?=[0-9a-f]*[a-f])[0-9a-f]{8,}" + _ASSET_EXTENSION)
+_ASSET_HASH = re.compile(r"(?<=[-.])(?![a-z_-]{8}\.)(?![A-Z_-]{8}\.)[A-Za-z0-9_-]{8}(?=\.(?:m?js|css|map|json|wasm)\b)")
+_ISO_TIME = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+# Require functions whose single numeric argument is a module id. Inside a module map
+# the minified name of the module function's third parameter is added, e.g. `n` in
+# `{123: function(e, t, n) {...}}`.
+_REQUIRE_CALLEES = {"__webpack_require__"}
+
+CHUNK_ID = "#id{}"
+MASK = "#"
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Splits JavaScript source into (kind, text) tokens, without whitespace.
+    Kinds are comment, string, number, name, regex and punct. It is a lexer, not a
+    parser: template literal substitutions stay inside the string token and unknown
+    characters become single-character punct tokens, which is all fingerprinting needs.
+    """
+    position = 0
+    previous_kind, previous = None, None
+    while True:
+        for match in _TOKEN.finditer(text, position):
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "slash":
+                if not (previous_kind in _DIVISION_AFTER
+                        or (previous_kind == "name" and previous not in _KEYWORDS_BEFORE_EXPRESSION)
+                        or (previous_kind == "punct" and previous in _DIVISION_AFTER_PUNCT)):
+                    regex = _REGEX.match(text, match.start(kind))
+                    if regex:
+                        # Regex literals are rare, so restarting the scan after one is cheap.
+                        yield "regex", regex.group()
+                        previous_kind, previous = "regex", None
+                        position = regex.end()
+                        break
+                kind = "punct"
+            yield kind, value
+            if kind != "comment":
+                previous_kind, previous = kind, value
+        else:
+            return
+
+
+def _module_entry(out: List[str]) -> Optional[Tuple[int, List[str]]]:
+    """
+    If `out` ends with the head of a webpack module map entry, i.e. `{123: function(e, t, n)`,
+    `, 123: (e, t, n) =>` or `{123: e =>`, returns the index of its numeric key and the
+    parameter names of the module function.
+    """
+    end = len(out)
+    if end and out[-1] == "=>":
+        end -= 1
+        arrow = True
+    else:
+        arrow = False
+    if end and out[end - 1] == ")":
+        start = end - 2
+        while start >= 0 and out[start] != "(":
+            if out[start] != "," and not out[start].isidentifier():
+                return None
+            start -= 1
+        if start < 0:
+            return None
+        params = [token for token in out[start + 1:end - 1] if token != ","]
+        if not arrow:
+            if start >= 1 and out[start - 1] != "function" and out[start - 1].isidentifier():
+                start -= 1  # named function expression
+            start -= 1
+            if start < 0 or out[start] != "function":
+                return None
+    elif arrow and end and out[end - 1].isidentifier():
+        start = end - 1
+        params = [out[start]]
+    else:
+        return None
+    key = start - 2
+    if key >= 1 and out[key + 1] == ":" and out[key].isdigit() and out[key - 1] in ("{", ","):
+        return key, params
+    return None
+
+
+def fingerprint(text: str, rules: Sequence[str] = DEFAULT_RULES, patterns: Sequence[str] = DEFAULT_PATTERNS) -> str:
+    """
+    Returns the hex semantic fingerprint of a JavaScript body: a digest of its token
+    stream after whitespace is dropped and the ignore rules are applied, so two bodies
+    that only differ cosmetically (minifier whitespace, banners, build hashes, source map
+    comments, renumbered webpack modules) get the same fingerprint. Masks are narrow on
+    purpose: a false "cosmetic" verdict drops a change notification.
+    """
+    rules = set(rules)
+    comments, source_maps = "comments" in rules, "source_maps" in rules
+    build_hashes, timestamps, chunk_ids = "build_hashes" in rules, "timestamps" in rules, "chunk_ids" in rules
+    extra = [re.compile(pattern) for pattern in patterns]
+
+    out: List[str] = []
+    # The require name each open `{` brought into scope, or None, and how many open
+    # module bodies use each name.
+    scopes: List[Optional[str]] = []
+    requires = dict.fromkeys(_REQUIRE_CALLEES, 1)
+    # Module ids renumbered in order of first appearance: renumbering every module keeps
+    # the fingerprint, pointing a require at another module does not.
+    chunk_ids_seen: Dict[str, str] = {}
+    for kind, token in tokenize(text):
+        if kind == "comment":
+            if comments or (source_maps and _SOURCE_MAP.match(token)):
+                continue
+        elif kind == "string":
+            if build_hashes:
+                token = _ASSET_HASH.sub(MASK, _HEX_HASH.sub(MASK, token))
+            if timestamps:
+                token = _ISO_TIME.sub(MASK, token)
+        elif kind == "punct" and chunk_ids:
+            if token == "{":
+                require = None
+                entry = _module_entry(out)
+                if entry is not None:
+                    # {1234: function(e, t, n) {...}, ...}
+                    key, params = entry
+                    out[key] = chunk_ids_seen.setdefault(out[key], CHUNK_ID.format(len(chunk_ids_seen)))
+                    if len(params) >= 3:
+                        require = params[2]
+                        requires[require] = requires.get(require, 0) + 1
+                scopes.append(require)
+            elif token == "}" and scopes:
+                require = scopes.pop()
+                if require is not None:
+                    requires[require] -= 1
+            elif (token == ")" and len(out) >= 3 and out[-2] == "(" and out[-1].isdigit()
+                  and requires.get(out[-3]) and (len(out) < 4 or out[-4] != ".")):
+                # n(1234) / __webpack_require__(1234)
+                out[-1] = chunk_ids_seen.setdefault(out[-1], CHUNK_ID.format(len(chunk_ids_seen)))
+        for pattern in extra:
+            token = pattern.sub(MASK, token)
+        out.append(token)
+    return hashlib.sha256('\x00'.join(out).encode()).hexdigest()
+
+
+class SemanticFingerprinter:
+    """
+    Computes semantic fingerprints off the event loop. Large bodies are tokenized in a
+    process pool so multi-megabyte bundles neither block the loop nor hold the GIL;
+    small ones run on a thread, where the round trip to a worker would cost more.
+    """
+
+    def __init__(self, rules: Optional[Sequence[str]] = None, patterns: Optional[Sequence[str]] = None,
+                 workers: Optional[int] = None, process_bytes: Optional[int] = None):
+        self.rules = tuple(DEFAULT_RULES if rules is None else rules)
+        self.patterns = tuple(DEFAULT_PATTERNS if patterns is None else patterns)
+        unknown = set(self.rules) - set(RULES)
+        if unknown:
+            raise ValueError(f"Unknown fingerprint rules: {', '.join(sorted(unknown))}")
+        for pattern in self.patterns:
+            re.compile(pattern)
+        self.workers = FINGERPRINT_WORKERS if workers is None else workers
+        self.process_bytes = FINGERPRINT_PROCESS_BYTES if process_bytes is None else process_bytes
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked: the parent runs an event loop and driver threads.
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    async def compute(self, text: Optional[str]) -> Optional[str]:
+        """
+        Returns the fingerprint of `text`, or None if it could not be computed.
+        """
+        if text is None:
+            return None
+        try:
+            if self.workers > 0 and len(text) >= self.process_bytes:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fingerprint, text, self.rules, self.patterns)
+            return await asyncio.to_thread(fingerprint, text, self.rules, self.patterns)
+        except Exception as e:
+            print(f"Error computing semantic fingerprint: {e}")
+            return None
+
+    def close(self):
+        """
+        Shuts the worker processes down.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+fingerprinter = SemanticFingerprinter()
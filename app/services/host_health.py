@@ -0,0 +1,223 @@
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+# Requests per second and burst allowed per host, with per-host overrides given as
+# "host=rate,other.host=rate". A rate of 0 turns rate limiting off.
+HOST_RATE = float(os.getenv('FETCH_HOST_RATE', '20'))
+HOST_BURST = float(os.getenv('FETCH_HOST_BURST', '40'))
+HOST_RATES = {
+    host.strip(): float(rate)
+    for host, _, rate in (item.partition('=') for item in os.getenv('FETCH_HOST_RATES', '').split(',') if '=' in item)
+}
+# Floor the rate of a host answering 429 is lowered to.
+HOST_MIN_RATE = float(os.getenv('FETCH_HOST_MIN_RATE', '0.2'))
+
+# Backoff after consecutive failures: BACKOFF_BASE * 2^(failures - 1), capped at BACKOFF_MAX seconds.
+BACKOFF_BASE = float(os.getenv('FETCH_BACKOFF_BASE', '1'))
+BACKOFF_MAX = float(os.getenv('FETCH_BACKOFF_MAX', '300'))
+# Consecutive failures that open a host's circuit, and how long it first stays open.
+CIRCUIT_THRESHOLD = int(os.getenv('FETCH_CIRCUIT_THRESHOLD', '5'))
+CIRCUIT_COOLDOWN = float(os.getenv('FETCH_CIRCUIT_COOLDOWN', '60'))
+CIRCUIT_MAX_COOLDOWN = float(os.getenv('FETCH_CIRCUIT_MAX_COOLDOWN', '900'))
+# Longest Retry-After honoured, in seconds.
+MAX_RETRY_AFTER = float(os.getenv('FETCH_MAX_RETRY_AFTER', '3600'))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Returns the delay in seconds requested by a Retry-After header, given either as
+    seconds or as an HTTP date, or None if it is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return min(max(retry_at.timestamp() - now, 0.0), MAX_RETRY_AFTER)
+
+
+@dataclass
+class HostHealth:
+    """
+    Politeness and health state of one host.
+
+    Requests are spaced by a token bucket whose rate halves on every 429 and grows back
+    by a twentieth of the configured rate per success; a configured rate of 0 means
+    the host is not rate limited. Each failure (429, 5xx, timeout or
+    connection error) blocks the host for an exponentially growing backoff, or for its
+    Retry-After if longer. CIRCUIT_THRESHOLD consecutive failures open the circuit:
+    requests fail fast for a cooldown, then a single probe decides whether it closes or
+    opens again for twice as long.
+    """
+    host: str
+    configured_rate: float
+    burst: float
+    rate: float = 0.0
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    circuit_trips: int = 0
+    blocked_until: float = 0.0
+    probe_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+    last_failure_at: Optional[float] = None
+
+    def __post_init__(self):
+        self.rate = self.rate or self.configured_rate
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+
+    def blocked_for(self, now: Optional[float] = None) -> float:
+        """
+        Seconds until the host may be contacted again because of backoff, Retry-After
+        or an open circuit.
+        """
+        now = time.monotonic() if now is None else now
+        return max(self.blocked_until - now, 0.0)
+
+    def admit(self, probe_timeout: float, now: Optional[float] = None) -> Optional[str]:
+        """
+        Returns why a request must fail fast right now ("circuit_open" or "backoff"), or
+        None if it may go ahead. Once an open circuit's cooldown ends, only one probe is
+        let through at a time; `probe_timeout` bounds how long that probe may take.
+        """
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN:
+            if now < self.blocked_until:
+                return "circuit_open"
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if now < self.probe_until:
+                return "circuit_open"
+            self.probe_until = now + probe_timeout
+            return None
+        if now < self.blocked_until:
+            return "backoff"
+        return None
+
+    def reserve(self, max_wait: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Takes a token, returning how long to wait before sending the request, or None
+        (without taking a token) if that would be longer than `max_wait`.
+        """
+        if self.configured_rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+        # Tokens go negative when requests queue up; each waits for its share of the rate.
+        delay = max(-(self.tokens - 1) / self.rate, 0.0)
+        if delay > max_wait:
+            return None
+        self.tokens -= 1
+        return delay
+
+    def record_success(self):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.rate = min(self.configured_rate, self.rate + self.configured_rate / 20)
+        if self.state != CLOSED:
+            print(f"Circuit for {self.host} closed.")
+            self.state = CLOSED
+            self.circuit_trips = 0
+            self.probe_until = 0.0
+
+    def record_failure(self, reason: str, retry_after: Optional[float] = None, throttled: bool = False,
+                       now: Optional[float] = None):
+        """
+        Records a failed request. `throttled` marks a 429, which also lowers the rate.
+        """
+        now = time.monotonic() if now is None else now
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = reason
+        self.last_failure_at = time.time()
+        if throttled and self.configured_rate > 0:
+            self.rate = max(HOST_MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+        # Up to +/-25% jitter keeps the workers of every node from retrying in lockstep.
+        backoff = min(BACKOFF_BASE * 2 ** (self.consecutive_failures - 1), BACKOFF_MAX) * random.uniform(0.75, 1.25)
+        delay = max(backoff, retry_after or 0.0)
+        if self.state == HALF_OPEN or self.consecutive_failures >= CIRCUIT_THRESHOLD:
+            self.circuit_trips += 1
+            cooldown = min(CIRCUIT_COOLDOWN * 2 ** (self.circuit_trips - 1), CIRCUIT_MAX_COOLDOWN)
+            delay = max(delay, cooldown)
+            if self.state != OPEN:
+                print(f"Circuit for {self.host} opened for {delay:.0f}s after {self.consecutive_failures}"
+                      f" consecutive failures ({reason}).")
+            self.state = OPEN
+            self.probe_until = 0.0
+        self.blocked_until = max(self.blocked_until, now + delay)
+
+    def snapshot(self) -> dict:
+        now_monotonic, now = time.monotonic(), time.time()
+        blocked_for = self.blocked_for(now_monotonic)
+        return {
+            "host": self.host,
+            "state": self.state,
+            "rate": self.rate,
+            "configured_rate": self.configured_rate,
+            "consecutive_failures": self.consecutive_failures,
+            "blocked_until": datetime.fromtimestamp(now + blocked_for) if blocked_for else None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_failure_at": datetime.fromtimestamp(self.last_failure_at) if self.last_failure_at else None,
+        }
+
+
+class HostHealthRegistry:
+    """
+    The HostHealth of every host contacted by a fetcher, created on first use.
+    """
+
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST, rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.rates = HOST_RATES if rates is None else rates
+        self._hosts: Dict[str, HostHealth] = {}
+
+    def get(self, host: str) -> HostHealth:
+        health = self._hosts.get(host)
+        if health is None:
+            rate = self.rates.get(host, self.rate)
+            # Overrides scale the burst with the rate.
+            burst = self.burst * rate / self.rate if rate > 0 and self.rate > 0 else self.burst
+            health = HostHealth(host, configured_rate=rate, burst=max(burst, 1.0))
+            self._hosts[host] = health
+        return health
+
+    def snapshot(self, hosts: Optional[Iterable[str]] = None, unhealthy_only: bool = False) -> List[dict]:
+        """
+        Returns the state of the given hosts (every known host by default), least healthy first.
+        """
+        if hosts:
+            states = [self._hosts[host] for host in hosts if host in self._hosts]
+        else:
+            states = list(self._hosts.values())
+        if unhealthy_only:
+            states = [state for state in states
+                      if state.state != CLOSED or state.consecutive_failures or state.rate < state.configured_rate]
+        states.sort(key=lambda state: (state.state == CLOSED, -state.consecutive_failures, state.host))
+        return [state.snapshot() for state in states]
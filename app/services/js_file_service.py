@@ -1,140 +1,575 @@
-import httpx
 from uuid import uuid4, UUID
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
 import asyncio
+import os
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db.database import database
-from app.models.js_file_model import js_files
-from app.models.schemas import JSFileResponse
-from app.messaging.publisher import publish_message
+from app.db.repository import JSFileRepository, METADATA_COLUMNS, repository as shared_repository
+from app.metrics import CHANGE_NOTIFICATIONS, REFRESHES
+from app.models.js_file_model import js_blobs, js_files, sha256_hex
+from app.models.schemas import (
+    JS_FILE_FIELDS, HostHealthResponse, JSFileProjection, JSFileResponse, JSFileVersionContent, JSFileVersionDiff,
+    JSFileVersionResponse,
+)
+from app.messaging.notifier import enqueue_change
+from app.services.blob_store import BlobStore, blob_store as shared_blob_store, decode_blob, decompress
+from app.services.fetcher import JSFetcher, fetcher as shared_fetcher
+from app.services.fingerprint import SemanticFingerprinter, fingerprinter as shared_fingerprinter
+from app.services.revisit import ChangeStats, next_interval
+from app.services.version_store import VersionStore, version_store as shared_version_store
+
+# Columns returned for ingested files.
+INGEST_RESULT_COLUMNS = [
+    js_files.c.id, js_files.c.url, js_files.c.host, js_files.c.priority,
+    js_files.c.company_id, js_files.c.last_fetched, js_files.c.last_updated,
+]
+
+# Rows per multi-row INSERT; keeps each statement well under the bind parameter limit.
+INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', '1000'))
+
+# Fetches in flight when refreshing many files at once, e.g. listings with fetch_content.
+REFRESH_CONCURRENCY = int(os.getenv('REFRESH_CONCURRENCY', '50'))
+
+# Whether content changes that keep the semantic fingerprint still get a change notification.
+NOTIFY_COSMETIC_CHANGES = os.getenv('NOTIFY_COSMETIC_CHANGES', 'false').lower() in ('1', 'true', 'yes')
+
+# Keyset pagination page sizes for list_files_page / iter_files.
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Every column, with the blob-backed content joined in from js_blobs.
+FILES_WITH_CONTENT = select(
+    js_files,
+    js_blobs.c.data.label("blob_data"),
+    js_blobs.c.encoding.label("blob_encoding"),
+).select_from(
+    js_files.outerjoin(js_blobs, js_blobs.c.hash == js_files.c.content_hash)
+)
+
+
+def select_files(fields: Optional[Iterable[str]] = None):
+    """
+    Builds the SELECT for listing files. With a field mask only the requested
+    columns are read, and js_blobs is only joined when `content` is requested,
+    so metadata listings never touch the content.
+    """
+    if fields is None:
+        return FILES_WITH_CONTENT
+
+    fields = set(fields)
+    unknown = fields - set(JS_FILE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    columns = [js_files.c[name] for name in JS_FILE_FIELDS if name == "id" or name in fields]
+    if "content" not in fields:
+        return select(*columns)
+    return select(
+        *columns,
+        js_blobs.c.data.label("blob_data"),
+        js_blobs.c.encoding.label("blob_encoding"),
+    ).select_from(
+        js_files.outerjoin(js_blobs, js_blobs.c.hash == js_files.c.content_hash)
+    )
+
+
+REFRESH_CHANGED = "changed"
+REFRESH_UNCHANGED = "unchanged"
+REFRESH_ERROR = "error"
+REFRESH_NOT_FOUND = "not_found"
+
+
+@dataclass
+class RefreshResult:
+    """
+    Outcome of refreshing a single file.
+    """
+    file_id: UUID
+    status: str
+    file: Optional[JSFileResponse] = None
+    error: Optional[str] = None
+    # When the file should be fetched again, from its estimated change rate.
+    next_fetch_at: Optional[datetime] = None
+    # The content changed, but only cosmetically, so no notification was published.
+    cosmetic: bool = False
+
 
 class JSFileService:
     """
     Service class for managing JS files in the database.
     """
     
-    async def _fetch_js_content(self, url: str) -> Optional[str]:
-        """
-        Fetches the content of a JavaScript file from a given URL.
-        """
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, follow_redirects=True, timeout=10.0)
-                response.raise_for_status()
-                
-                print(f"Fetched content from {url}:\n---\n{response.text}\n---")
-                
-                return response.text
-            except httpx.HTTPStatusError as e:
-                print(f"HTTP Error fetching {url}: {e.response.status_code}")
-                return None
-            except httpx.RequestError as e:
-                print(f"Request Error fetching {url}: {e}")
-                return None
+    def __init__(self, fetcher: Optional[JSFetcher] = None, blob_store: Optional[BlobStore] = None,
+                 version_store: Optional[VersionStore] = None, repository: Optional[JSFileRepository] = None,
+                 fingerprinter: Optional[SemanticFingerprinter] = None):
+        self.fetcher = fetcher or shared_fetcher
+        self.blob_store = blob_store or shared_blob_store
+        self.version_store = version_store or shared_version_store
+        self.repository = repository or shared_repository
+        self.fingerprinter = fingerprinter or shared_fingerprinter
+
+    @staticmethod
+    def _to_response(record, fields: Optional[Iterable[str]] = None,
+                     accept_encodings: Iterable[str] = ()) -> Union[JSFileResponse, JSFileProjection]:
+        """
+        Builds a response from a select_files() row, decompressing blob-backed content.
+        Blobs stored in one of `accept_encodings` are passed on as they are, in
+        compressed_content, and left for the caller to decompress.
+        Rows selected with a field mask become projections holding just those fields.
+        """
+        file_dict = dict(record)
+        has_blob = 'blob_data' in file_dict
+        blob_data = file_dict.pop('blob_data', None)
+        blob_encoding = file_dict.pop('blob_encoding', None)
+        if has_blob and file_dict.get('content') is None:
+            if blob_data is not None and blob_encoding in accept_encodings:
+                file_dict['compressed_content'] = blob_data
+                file_dict['content_encoding'] = blob_encoding
+            else:
+                file_dict['content'] = decode_blob(blob_data, blob_encoding)
+        if fields is not None:
+            return JSFileProjection(**file_dict)
+        return JSFileResponse(**file_dict)
 
     async def update_file_content(self, file_id: UUID) -> Optional[JSFileResponse]:
         """
         Fetches the content for a specific file from its URL and updates the database.
-        Also publishes a notification if the content has changed.
+        Stored ETag / Last-Modified validators are sent with the request, so an unchanged
+        file costs a 304 and only its last_fetched timestamp is updated.
+
+        Changes are detected by comparing SHA-256 digests, so the stored content is never
+        read back; the returned record only carries content when the content changed.
+        If the content has changed, a change notification is written to the outbox in the
+        same transaction (see OutboxRelay), unless the change is only cosmetic (same
+        semantic fingerprint, see app.services.fingerprint).
         """
-        query = js_files.select().where(js_files.c.id == file_id)
-        existing_file = await database.fetch_one(query)
-        
+        refreshed = await self.refresh_file(file_id)
+        return refreshed.file if refreshed else None
+
+    async def refresh_file(self, file_id: UUID) -> Optional[RefreshResult]:
+        """
+        Like update_file_content, but returns the full RefreshResult, or None if the file doesn't exist.
+        """
+        existing_file = await self.repository.get_file(file_id)
         if not existing_file:
             return None
+        return await self._refresh(existing_file)
+
+    @staticmethod
+    def _schedule_values(existing_file, now: datetime, changed: bool) -> dict:
+        """
+        Adds this fetch to the file's change history and derives its next fetch time.
+        """
+        stats = ChangeStats.from_record(existing_file)
+        if existing_file.last_fetched:
+            # The very first fetch has nothing to compare with.
+            stats = stats.observe((now - existing_file.last_fetched).total_seconds(), changed)
+        interval = next_interval(existing_file.priority, stats)
+        return {**stats.values(), "next_fetch_at": now + timedelta(seconds=interval)}
+
+    async def _refresh(self, existing_file, conditional: bool = True,
+                       deferred: Optional[List[dict]] = None) -> RefreshResult:
+        """
+        Fetches and stores the content for a row selected with METADATA_COLUMNS.
+        With conditional=False no validators are sent, so the content is always downloaded
+        and returned, even when it did not change.
+        When a `deferred` list is given, the timestamp/validator update of an unchanged
+        file is appended to it for a later repository.touch_files() instead of being written now.
+        """
+        file_id = existing_file.id
+        result = await self.fetcher.fetch_conditional(
+            existing_file.url,
+            host=existing_file.host,
+            etag=existing_file.etag if conditional else None,
+            last_modified=existing_file.last_modified if conditional else None,
+        )
         
-        new_content = await self._fetch_js_content(existing_file.url)
-        
-        if new_content is not None:
-            if existing_file.content != new_content:
-                now = datetime.now()
-                update_query = (
-                    js_files.update()
-                    .where(js_files.c.id == file_id)
-                    .values(content=new_content, last_fetched=now)
-                )
-                await database.execute(update_query)
-                
-                notification_message = {
-                    "file_id": str(file_id),
-                    "url": existing_file.url,
-                    "change_found_at": str(now)
-                }
-                asyncio.ensure_future(publish_message("file_changes", notification_message))
-
-                updated_record = await database.fetch_one(query)
-                return JSFileResponse(**updated_record)
-        
-        return JSFileResponse(**existing_file)
+        if result is None:
+            REFRESHES.labels('error').inc()
+            return RefreshResult(file_id, REFRESH_ERROR, JSFileResponse(**existing_file, content=None),
+                                 error="Fetch failed")
+
+        now = datetime.now()
+        values = {
+            "last_fetched": now,
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+        }
+
+        if result.not_modified or existing_file.content_hash == result.content_hash:
+            REFRESHES.labels('not_modified' if result.not_modified else 'same_hash').inc()
+            if result.content_length is not None:
+                values["content_length"] = result.content_length
+                values["content_hash"] = result.content_hash
+            values.update(self._schedule_values(existing_file, now, changed=False))
+            # A conditional refresh never decodes a body whose digest shows nothing changed;
+            # an unconditional one was asked for the content, so it is returned.
+            content = None if conditional else result.content
+            if deferred is not None:
+                deferred.append({"id": file_id, **values})
+                file = JSFileResponse(**{**dict(existing_file), **values, "content": content})
+            else:
+                touched = await self.repository.touch_file(file_id, values)
+                file = JSFileResponse(**(touched or {**dict(existing_file), **values}), content=content)
+            return RefreshResult(file_id, REFRESH_UNCHANGED, file, next_fetch_at=values["next_fetch_at"])
+
+        semantic_hash = await self.fingerprinter.compute(result.content)
+        # Without both fingerprints (rows stored before they existed, or a failure) assume it matters.
+        cosmetic = semantic_hash is not None and semantic_hash == existing_file.semantic_hash
+        values.update(
+            content=None,
+            content_length=result.content_length,
+            content_hash=result.content_hash,
+            semantic_hash=semantic_hash,
+            **self._schedule_values(existing_file, now, changed=True),
+        )
+        notify = not cosmetic or NOTIFY_COSMETIC_CHANGES
+        # Compression and delta encoding run before the transaction, which then only
+        # holds the row lock and its connection for the writes.
+        blob = await self.blob_store.prepare(result.content_hash, result.content)
+        version = await self.version_store.prepare(file_id, result.content)
+        async with database.transaction():
+            # Only applies if the row still holds the content read before the fetch. A refresh
+            # of the same file that committed in the meantime already moved the blob
+            # references and recorded the version and notification, so this one backs off.
+            updated = await database.fetch_one(
+                js_files.update()
+                .where(js_files.c.id == file_id)
+                .where(func.coalesce(js_files.c.content_hash, sha256_hex(js_files.c.content))
+                       .is_not_distinct_from(existing_file.content_hash))
+                .values(**values)
+                .returning(js_files.c.id)
+            )
+            if updated is not None:
+                await self.blob_store.put(result.content_hash, result.content, blob)
+                if not existing_file.has_inline_content:
+                    await self.blob_store.release(existing_file.content_hash)
+                await self.version_store.record(file_id, now, result.content_hash, result.content, version)
+                if notify:
+                    await enqueue_change({
+                        "file_id": str(file_id),
+                        "company_id": str(existing_file.company_id),
+                        "url": existing_file.url,
+                        "change_found_at": str(now),
+                        "semantic_hash": semantic_hash,
+                        "cosmetic": cosmetic,
+                    })
 
-    async def add_files(self, files: List[dict]):
+        if updated is None:
+            REFRESHES.labels('superseded').inc()
+            current = await self.repository.get_file(file_id) or existing_file
+            content = result.content if current.content_hash == result.content_hash else None
+            return RefreshResult(file_id, REFRESH_UNCHANGED, JSFileResponse(**current, content=content),
+                                 next_fetch_at=current.next_fetch_at)
+
+        REFRESHES.labels('cosmetic' if cosmetic else 'changed').inc()
+        if notify:
+            CHANGE_NOTIFICATIONS.labels('queued').inc()
+        file = JSFileResponse(**{**dict(existing_file), **values, "content": result.content})
+        return RefreshResult(file_id, REFRESH_CHANGED, file, next_fetch_at=values["next_fetch_at"], cosmetic=cosmetic)
+
+    async def add_files(self, files: List[dict]) -> List[dict]:
         """
         Adds new JS files to the database.
         
-        The files parameter is a list of dictionaries.
+        The files parameter is a list of dictionaries. All rows are written in one
+        transaction with multi-row INSERTs; files already tracked for the same company
+        and URL are left untouched and their existing rows are returned instead, so
+        re-submitting files is a cheap no-op. Each result's `created` tells which rows are new.
         """
-        results = []
+        now = datetime.now()
+        rows = {}
         for file in files:
-            file_id = uuid4()
-            now = datetime.now()
-            query = js_files.insert().values(
-                id=file_id,
-                url=file['url'],
-                host=file['url'].split('/')[2],
-                content=None,
-                priority=file['priority'],
-                company_id=file['company_id'],
-                last_fetched=None,
-                last_updated=now,
-            )
-            await database.execute(query)
-            results.append({
-                "id": file_id,
-                "url": file['url'],
-                "host": file['url'].split('/')[2],
-                "content": None,
+            url = str(file['url'])
+            rows.setdefault((file['company_id'], url), {
+                "id": uuid4(),
+                "url": url,
+                "host": url.split('/')[2],
                 "priority": file['priority'],
                 "company_id": file['company_id'],
-                "last_fetched": None,
                 "last_updated": now,
             })
+
+        rows = list(rows.values())
+        results = []
+        async with database.transaction():
+            for start in range(0, len(rows), INGEST_CHUNK_SIZE):
+                chunk = rows[start:start + INGEST_CHUNK_SIZE]
+                query = (
+                    insert(js_files)
+                    .values(chunk)
+                    .on_conflict_do_nothing(index_elements=[js_files.c.company_id, js_files.c.url])
+                    .returning(*INGEST_RESULT_COLUMNS)
+                )
+                inserted = [dict(record, created=True) for record in await database.fetch_all(query)]
+                results.extend(inserted)
+
+                if len(inserted) < len(chunk):
+                    inserted_keys = {(record['company_id'], record['url']) for record in inserted}
+                    duplicates = [
+                        (row['company_id'], row['url']) for row in chunk
+                        if (row['company_id'], row['url']) not in inserted_keys
+                    ]
+                    existing_query = select(*INGEST_RESULT_COLUMNS).where(
+                        tuple_(js_files.c.company_id, js_files.c.url).in_(duplicates)
+                    )
+                    results.extend(dict(record, created=False) for record in await database.fetch_all(existing_query))
+
+        for result in results:
+            result['content'] = None
         return results
 
-    async def list_files_by_company(self, company_id: UUID, fetch_content: bool) -> List[JSFileResponse]:
+    async def fetch_created_files(self, results: List[dict]) -> list:
         """
-        Lists all JS files for a given company, optionally fetching their content.
+        Fetches the content of the files add_files() created, at most REFRESH_CONCURRENCY
+        at a time, and returns `results` with each fetched file in place of its row.
+        Files that already existed are returned as they are.
+        """
+        created = [result['id'] for result in results if result['created']]
+        if not created:
+            return results
+        records = await database.fetch_all(select(*METADATA_COLUMNS).where(js_files.c.id.in_(created)))
+        refreshed = {outcome.file_id: outcome.file async for outcome in self.refresh_files(records)}
+        return [refreshed.get(result['id']) or result for result in results]
+
+    async def refresh_files(self, records, concurrency: Optional[int] = None, conditional: bool = True,
+                            deferred: Optional[List[dict]] = None) -> AsyncIterator[RefreshResult]:
         """
-        query = js_files.select().where(js_files.c.company_id == company_id)
+        Refreshes rows selected with METADATA_COLUMNS with at most `concurrency` fetches
+        in flight, yielding each outcome as soon as its fetch completes. A failure on one
+        file is reported as an error outcome rather than aborting the others.
+        """
+        concurrency = concurrency or REFRESH_CONCURRENCY
+        records = iter(records)
+        pending = {}
+        while True:
+            for record in records:
+                task = asyncio.ensure_future(self._refresh(record, conditional=conditional, deferred=deferred))
+                pending[task] = record
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                record = pending.pop(task)
+                if task.exception() is not None:
+                    print(f"Error refreshing file {record.id}: {task.exception()}")
+                    yield RefreshResult(record.id, REFRESH_ERROR, JSFileResponse(**record, content=None),
+                                        error=str(task.exception()))
+                else:
+                    yield task.result()
+
+    async def batch_refresh(self, file_ids: Optional[List[UUID]] = None, company_id: Optional[UUID] = None,
+                            concurrency: Optional[int] = None) -> AsyncIterator[RefreshResult]:
+        """
+        Refreshes the given files and/or every file of a company. Rows are loaded with a
+        single query, fetched concurrently, and the updates of unchanged files are
+        written in bulk. Outcomes are yielded as soon as they are known; ids that don't
+        exist are reported as not found.
+        """
+        criteria = []
+        if file_ids:
+            criteria.append(js_files.c.id.in_(file_ids))
+        if company_id:
+            criteria.append(js_files.c.company_id == company_id)
+        if not criteria:
+            return
+
+        records = await database.fetch_all(select(*METADATA_COLUMNS).where(*criteria))
+        found = {record.id for record in records}
+        for file_id in dict.fromkeys(file_ids or []):
+            if file_id not in found:
+                yield RefreshResult(file_id, REFRESH_NOT_FOUND)
+
+        deferred = []
+        try:
+            async for refreshed in self.refresh_files(records, concurrency=concurrency, deferred=deferred):
+                yield refreshed
+                if len(deferred) >= INGEST_CHUNK_SIZE:
+                    pending, deferred[:] = list(deferred), []
+                    await self.repository.touch_files(pending)
+        finally:
+            await self.repository.touch_files(deferred)
+
+    async def _list_fetching(self, fields: Optional[Iterable[str]], *criteria) -> List[JSFileResponse]:
+        """
+        Downloads the content of every matching file concurrently, persisting it as a
+        refresh would, and returns the files in the order their fetches completed.
+        """
+        select_files(fields)  # validates the field mask
+        query = select(*METADATA_COLUMNS).where(*criteria)
         records = await database.fetch_all(query)
-        
+        return [
+            self._project(refreshed.file, fields)
+            async for refreshed in self.refresh_files(records, conditional=False)
+        ]
+
+    @staticmethod
+    def _project(file: JSFileResponse, fields: Optional[Iterable[str]]):
+        if fields is None:
+            return file
+        return JSFileProjection(**file.model_dump(include={'id', *fields}))
+
+    async def list_files_by_company(self, company_id: UUID, fetch_content: bool,
+                                    fields: Optional[Iterable[str]] = None,
+                                    accept_encodings: Iterable[str] = ()) -> List[JSFileResponse]:
+        """
+        Lists all JS files for a given company, optionally fetching their content.
+        Fetched content is stored like a regular refresh.
+        `fields` restricts the columns read, see select_files(); stored content in one
+        of `accept_encodings` is returned compressed, see _to_response().
+        """
         if fetch_content:
-            results = []
-            for record in records:
-                file_dict = dict(record)
-                content = await self._fetch_js_content(file_dict['url'])
-                file_dict['content'] = content
-                file_dict['last_fetched'] = datetime.now() if content else None
-                results.append(JSFileResponse(**file_dict))
-            return results
-        
-        return [JSFileResponse(**record) for record in records]
+            return await self._list_fetching(fields, js_files.c.company_id == company_id)
+
+        query = select_files(fields).where(js_files.c.company_id == company_id)
+        records = await database.fetch_all(query)
+        accept_encodings = frozenset(accept_encodings)
+        return [self._to_response(record, fields, accept_encodings) for record in records]
 
-    async def list_all_files(self, fetch_content: bool) -> List[JSFileResponse]:
+    async def list_all_files(self, fetch_content: bool,
+                             fields: Optional[Iterable[str]] = None,
+                             accept_encodings: Iterable[str] = ()) -> List[JSFileResponse]:
         """
         Lists all JS files in the database, optionally fetching their content.
+        Fetched content is stored like a regular refresh.
+        `fields` restricts the columns read, see select_files(); stored content in one
+        of `accept_encodings` is returned compressed, see _to_response().
         """
-        query = js_files.select()
+        if fetch_content:
+            return await self._list_fetching(fields)
+
+        query = select_files(fields)
         records = await database.fetch_all(query)
-        
+        accept_encodings = frozenset(accept_encodings)
+        return [self._to_response(record, fields, accept_encodings) for record in records]
+
+    def _page_query(self, company_id: Optional[UUID], after: Optional[UUID], limit: int,
+                    fields: Optional[Iterable[str]] = None):
+        query = select_files(fields)
+        if company_id:
+            query = query.where(js_files.c.company_id == company_id)
+        if after:
+            query = query.where(js_files.c.id > after)
+        return query.order_by(js_files.c.id).limit(min(limit, MAX_PAGE_SIZE))
+
+    async def list_files_page(self, company_id: Optional[UUID] = None, after: Optional[UUID] = None,
+                              limit: int = DEFAULT_PAGE_SIZE,
+                              fields: Optional[Iterable[str]] = None,
+                              accept_encodings: Iterable[str] = ()) -> Tuple[List[JSFileResponse], Optional[UUID]]:
+        """
+        Returns one page of files ordered by id, starting after the given id, together
+        with the cursor for the next page (None on the last page).
+        """
+        query = self._page_query(company_id, after, limit, fields)
+        records = await database.fetch_all(query)
+        accept_encodings = frozenset(accept_encodings)
+        files = [self._to_response(record, fields, accept_encodings) for record in records]
+        next_cursor = files[-1].id if len(files) == min(limit, MAX_PAGE_SIZE) else None
+        return files, next_cursor
+
+    async def iter_files(self, company_id: Optional[UUID] = None, after: Optional[UUID] = None,
+                         page_size: int = DEFAULT_PAGE_SIZE,
+                         fields: Optional[Iterable[str]] = None,
+                         fetch_content: bool = False,
+                         accept_encodings: Iterable[str] = ()) -> AsyncIterator[JSFileResponse]:
+        """
+        Yields every file ordered by id, reading the table one keyset page at a time
+        through a database cursor so memory use does not grow with the table size.
+
+        With fetch_content, each page is refreshed concurrently and files are yielded
+        as their fetches complete, so ordering is only preserved between pages.
+        Otherwise stored content in one of `accept_encodings` is yielded compressed.
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        accept_encodings = frozenset(accept_encodings)
         if fetch_content:
-            results = []
-            for record in records:
-                file_dict = dict(record)
-                content = await self._fetch_js_content(file_dict['url'])
-                file_dict['content'] = content
-                file_dict['last_fetched'] = datetime.now() if content else None
-                results.append(JSFileResponse(**file_dict))
-            return results
+            select_files(fields)  # validates the field mask
+            while True:
+                query = select(*METADATA_COLUMNS).order_by(js_files.c.id).limit(page_size)
+                if company_id:
+                    query = query.where(js_files.c.company_id == company_id)
+                if after:
+                    query = query.where(js_files.c.id > after)
+                records = await database.fetch_all(query)
+                async for refreshed in self.refresh_files(records, conditional=False):
+                    yield self._project(refreshed.file, fields)
+                if len(records) < page_size:
+                    return
+                after = records[-1].id
+
+        while True:
+            count = 0
+            async for record in database.iterate(self._page_query(company_id, after, page_size, fields)):
+                count += 1
+                after = record['id']
+                yield self._to_response(record, fields, accept_encodings)
+            if count < page_size:
+                return
+
+    async def get_content(self, file_id: UUID,
+                          accept_encodings: Iterable[str] = ()) -> Optional[Tuple[Optional[bytes], Optional[str]]]:
+        """
+        Returns the stored content of a file as (bytes, encoding). Content stored in one of
+        `accept_encodings` is returned as it is, with its encoding; anything else is
+        decompressed and returned as UTF-8 with encoding None. The bytes are None if the
+        file was never fetched, and None is returned if the file does not exist.
+        """
+        record = await database.fetch_one(select_files(["content"]).where(js_files.c.id == file_id))
+        if not record:
+            return None
+        if record["content"] is not None:
+            return record["content"].encode('utf-8'), None
+        data, encoding = record["blob_data"], record["blob_encoding"]
+        if data is None:
+            return None, None
+        if encoding in accept_encodings:
+            return data, encoding
+        return await asyncio.to_thread(decompress, data, encoding), None
 
-        return [JSFileResponse(**record) for record in records]
+    def host_health(self, hosts: Optional[Iterable[str]] = None,
+                    unhealthy_only: bool = False) -> List[HostHealthResponse]:
+        """
+        Returns the rate limit, backoff and circuit breaker state of the hosts this
+        process has fetched from, least healthy first.
+        """
+        return [HostHealthResponse(**state) for state in self.fetcher.hosts.snapshot(hosts, unhealthy_only)]
+
+    async def list_versions(self, file_id: UUID) -> List[JSFileVersionResponse]:
+        """
+        Lists the stored content versions of a file, newest first.
+        """
+        versions = await self.version_store.list_versions(file_id)
+        return [JSFileVersionResponse(**version) for version in versions]
+
+    async def get_version(self, version_id: UUID) -> Optional[JSFileVersionContent]:
+        """
+        Returns a stored version with its reconstructed content.
+        """
+        version = await self.version_store.get_version(version_id)
+        if not version:
+            return None
+        content = await self.version_store.get_content(version)
+        return JSFileVersionContent(version=JSFileVersionResponse(**version), content=content)
+
+    async def diff_versions(self, from_version_id: UUID, to_version_id: UUID,
+                            context_lines: int = 3) -> Optional[JSFileVersionDiff]:
+        """
+        Returns a unified diff between two stored versions, or None if either doesn't exist.
+        """
+        from_version = await self.version_store.get_version(from_version_id)
+        to_version = await self.version_store.get_version(to_version_id)
+        if not from_version or not to_version:
+            return None
+        diff = await self.version_store.diff(from_version, to_version, context_lines)
+        return JSFileVersionDiff(
+            from_version=JSFileVersionResponse(**from_version),
+            to_version=JSFileVersionResponse(**to_version),
+            diff=diff,
+        )
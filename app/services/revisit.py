@@ -0,0 +1,115 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# Revisit interval in seconds for each value of the `priority` column (1 is the most urgent),
+# used until a file has enough fetch history for a change-rate estimate.
+PRIORITY_INTERVALS = {
+    1: 5 * 60,
+    2: 15 * 60,
+    3: 60 * 60,
+    4: 6 * 60 * 60,
+    5: 24 * 60 * 60,
+}
+DEFAULT_INTERVAL = PRIORITY_INTERVALS[3]
+
+# Shortest and longest revisit interval in seconds allowed for each priority, whatever
+# the estimated change rate.
+PRIORITY_BOUNDS: Dict[int, Tuple[int, int]] = {
+    1: (60, 60 * 60),
+    2: (5 * 60, 6 * 60 * 60),
+    3: (15 * 60, 24 * 60 * 60),
+    4: (60 * 60, 3 * 24 * 60 * 60),
+    5: (6 * 60 * 60, 7 * 24 * 60 * 60),
+}
+DEFAULT_BOUNDS = PRIORITY_BOUNDS[3]
+
+# Fetches observed before the estimate replaces the priority's default interval.
+MIN_OBSERVATIONS = int(os.getenv('REVISIT_MIN_OBSERVATIONS', '3'))
+# Observations after which an old observation counts half, so the estimate follows files
+# whose release cadence changes.
+HALF_LIFE_OBSERVATIONS = float(os.getenv('REVISIT_HALF_LIFE', '20'))
+# A file is revisited once the chance that it changed since the last fetch reaches this.
+CHANGE_PROBABILITY = float(os.getenv('REVISIT_CHANGE_PROBABILITY', '0.5'))
+
+DECAY = 0.5 ** (1 / HALF_LIFE_OBSERVATIONS)
+
+
+def revisit_interval(priority: Optional[int]) -> int:
+    """
+    Returns the default revisit interval in seconds for a given priority.
+    """
+    return PRIORITY_INTERVALS.get(priority, DEFAULT_INTERVAL)
+
+
+@dataclass
+class ChangeStats:
+    """
+    Exponentially decayed fetch history of a file: how many fetches observed it, how many
+    of them found a change, and the total time those fetches covered.
+    """
+    observations: float = 0.0
+    changes: float = 0.0
+    observed_seconds: float = 0.0
+
+    @classmethod
+    def from_record(cls, record) -> 'ChangeStats':
+        return cls(
+            observations=record['change_observations'] or 0.0,
+            changes=record['change_detections'] or 0.0,
+            observed_seconds=record['observed_seconds'] or 0.0,
+        )
+
+    def observe(self, elapsed: float, changed: bool) -> 'ChangeStats':
+        """
+        Returns the stats after a fetch made `elapsed` seconds after the previous one.
+        """
+        return ChangeStats(
+            observations=self.observations * DECAY + 1,
+            changes=self.changes * DECAY + (1 if changed else 0),
+            observed_seconds=self.observed_seconds * DECAY + max(elapsed, 0.0),
+        )
+
+    @property
+    def rate(self) -> Optional[float]:
+        """
+        Estimated changes per second, or None while there is too little history.
+
+        A fetch only tells whether at least one change happened since the previous one,
+        so the plain changes / time ratio underestimates files that change between most
+        fetches. This uses Cho and Garcia-Molina's bias-reduced estimator for such
+        observations, -log((n - x + 0.5) / (n + 0.5)) / mean interval.
+        """
+        if self.observations < MIN_OBSERVATIONS or self.observed_seconds <= 0:
+            return None
+        mean_interval = self.observed_seconds / self.observations
+        unchanged = max(self.observations - self.changes, 0.0)
+        return -math.log((unchanged + 0.5) / (self.observations + 0.5)) / mean_interval
+
+    def values(self) -> dict:
+        """
+        The js_files columns holding these stats.
+        """
+        return {
+            "change_observations": self.observations,
+            "change_detections": self.changes,
+            "observed_seconds": self.observed_seconds,
+            "change_rate": self.rate,
+        }
+
+
+def next_interval(priority: Optional[int], stats: ChangeStats) -> float:
+    """
+    Seconds until a file should be fetched again: long enough for a change to have
+    happened with probability CHANGE_PROBABILITY, within the priority's bounds.
+    """
+    low, high = PRIORITY_BOUNDS.get(priority, DEFAULT_BOUNDS)
+    rate = stats.rate
+    if rate is None:
+        interval = revisit_interval(priority)
+    elif rate <= 0:
+        interval = high
+    else:
+        interval = -math.log(1 - CHANGE_PROBABILITY) / rate
+    return min(max(interval, low), high)
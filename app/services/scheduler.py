@@ -0,0 +1,263 @@
+import asyncio
+import heapq
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from app.db.database import database
+from app.db.repository import JSFileRepository, repository as shared_repository
+from app.models.js_file_model import js_files
+from app.services.js_file_service import JSFileService
+from app.services.revisit import revisit_interval
+
+# "local" keeps the schedule in memory and suits a single node; "lease" lets any number
+# of nodes share the work by claiming due files in Postgres.
+SCHEDULER_MODE = os.getenv('SCHEDULER_MODE', 'local')
+
+
+class RecrawlScheduler:
+    """
+    Background scheduler that keeps every tracked JS file in a due-time heap
+    and refreshes files through JSFileService.refresh_file as they become due. Each
+    file is rescheduled at the next fetch time derived from its estimated change rate.
+
+    The table is read once on startup; afterwards only rows inserted since the last
+    sync are loaded, so a tick never scans the whole table.
+    """
+
+    def __init__(self, service: Optional[JSFileService] = None, concurrency: Optional[int] = None,
+                 sync_interval: Optional[float] = None):
+        self.service = service or JSFileService()
+        self.concurrency = concurrency or int(os.getenv('SCHEDULER_CONCURRENCY', '20'))
+        self.sync_interval = sync_interval or float(os.getenv('SCHEDULER_SYNC_INTERVAL', '30'))
+
+        # Heap of (due timestamp, file id). Entries are invalidated lazily: an entry is only
+        # live if its due time still matches the one recorded in self._entries.
+        self._heap: List[Tuple[float, UUID]] = []
+        # file id -> (due timestamp or None while the file is being refreshed, priority)
+        self._entries: Dict[UUID, Tuple[Optional[float], Optional[int]]] = {}
+        self._watermark: Optional[datetime] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, file_id: UUID, priority: Optional[int], due: float):
+        """
+        Adds a file to the heap, or moves it if it is already scheduled.
+        """
+        self._entries[file_id] = (due, priority)
+        heapq.heappush(self._heap, (due, file_id))
+
+    def _schedule_record(self, record, now: float):
+        if record['next_fetch_at']:
+            due = record['next_fetch_at'].timestamp()
+        elif record['last_fetched']:
+            due = record['last_fetched'].timestamp() + revisit_interval(record['priority'])
+        else:
+            due = now
+        self.schedule(record['id'], record['priority'], due)
+
+    async def _sync(self):
+        """
+        Loads rows added since the previous sync. The first call loads the whole table.
+        """
+        query = js_files.select().with_only_columns(
+            js_files.c.id, js_files.c.priority, js_files.c.last_fetched, js_files.c.last_updated,
+            js_files.c.next_fetch_at,
+        )
+        if self._watermark is not None:
+            # Overlap the window so rows committed slightly out of order are not missed.
+            since = self._watermark - timedelta(seconds=self.sync_interval)
+            query = query.where(js_files.c.last_updated >= since)
+
+        now = time.time()
+        added = 0
+        watermark = self._watermark
+        async for record in database.iterate(query):
+            if record['last_updated'] and (watermark is None or record['last_updated'] > watermark):
+                watermark = record['last_updated']
+            if record['id'] in self._entries:
+                continue
+            self._schedule_record(record, now)
+            added += 1
+
+        self._watermark = watermark or datetime.now()
+        if added:
+            print(f"Scheduler: tracking {added} new files ({len(self._entries)} total).")
+
+    def _pop_due(self, now: float) -> Optional[UUID]:
+        while self._heap and self._heap[0][0] <= now:
+            due, file_id = heapq.heappop(self._heap)
+            entry = self._entries.get(file_id)
+            if entry is None or entry[0] != due:
+                continue
+            self._entries[file_id] = (None, entry[1])
+            return file_id
+        return None
+
+    def _next_due(self) -> Optional[float]:
+        while self._heap:
+            due, file_id = self._heap[0]
+            entry = self._entries.get(file_id)
+            if entry is not None and entry[0] == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    async def _worker(self):
+        while True:
+            file_id = await self._queue.get()
+            priority = self._entries.get(file_id, (None, None))[1]
+            try:
+                refreshed = await self.service.refresh_file(file_id)
+            except Exception as e:
+                print(f"Scheduler: error refreshing file {file_id}: {e}")
+                refreshed = False
+            finally:
+                self._queue.task_done()
+
+            if refreshed is None:
+                # The row no longer exists.
+                self._entries.pop(file_id, None)
+                continue
+            if refreshed and refreshed.file:
+                priority = refreshed.file.priority
+            if refreshed and refreshed.next_fetch_at:
+                due = refreshed.next_fetch_at.timestamp()
+            else:
+                due = time.time() + revisit_interval(priority)
+            self.schedule(file_id, priority, due)
+
+    async def run(self):
+        """
+        Runs the scheduler until cancelled.
+        """
+        self._queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        print(f"Recrawl scheduler starting with {self.concurrency} workers...")
+
+        next_sync = 0.0
+        try:
+            while True:
+                now = time.time()
+                if now >= next_sync:
+                    try:
+                        await self._sync()
+                    except Exception as e:
+                        print(f"Scheduler: error syncing files: {e}")
+                    next_sync = time.time() + self.sync_interval
+
+                file_id = self._pop_due(time.time())
+                while file_id is not None:
+                    # Blocks while all workers are busy, which bounds the number of in-flight refreshes.
+                    await self._queue.put(file_id)
+                    file_id = self._pop_due(time.time())
+
+                next_due = self._next_due()
+                wake_at = next_sync if next_due is None else min(next_due, next_sync)
+                await asyncio.sleep(max(0.0, wake_at - time.time()))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+class LeaseScheduler:
+    """
+    Scheduler for running refresh workers on several nodes against the same database.
+
+    Each node repeatedly leases a batch of due files with SELECT ... FOR UPDATE SKIP LOCKED,
+    so concurrent nodes always get disjoint batches, refreshes them, and releases the
+    leases with each file's next due time. Claiming moves next_fetch_at to the lease
+    expiry, so the files of a node that dies become due again when its leases run out.
+    Leases must outlast a batch: with the defaults a batch of 100 files at 20 concurrent
+    fetches takes well under the 5 minute lease even if every fetch times out.
+    """
+
+    def __init__(self, service: Optional[JSFileService] = None, repository: Optional[JSFileRepository] = None,
+                 concurrency: Optional[int] = None, batch_size: Optional[int] = None,
+                 lease_seconds: Optional[float] = None, poll_interval: Optional[float] = None,
+                 pipeline: Optional[int] = None):
+        self.service = service or JSFileService()
+        self.repository = repository or shared_repository
+        self.concurrency = concurrency or int(os.getenv('SCHEDULER_CONCURRENCY', '20'))
+        self.batch_size = batch_size or int(os.getenv('SCHEDULER_LEASE_BATCH', '100'))
+        self.lease_seconds = lease_seconds or float(os.getenv('SCHEDULER_LEASE_SECONDS', '300'))
+        self.poll_interval = poll_interval or float(os.getenv('SCHEDULER_POLL_INTERVAL', '1'))
+        # Batches processed at once, so a slow fetch at the end of one batch doesn't idle the node.
+        self.pipeline = pipeline or int(os.getenv('SCHEDULER_LEASE_PIPELINE', '2'))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+        self._batches: Set[asyncio.Task] = set()
+
+    async def claim(self) -> list:
+        """
+        Leases the next batch of due files to this node.
+        """
+        now = datetime.now()
+        return await self.repository.claim_due(
+            self.owner, self.batch_size, now, now + timedelta(seconds=self.lease_seconds)
+        )
+
+    async def process(self, records) -> int:
+        """
+        Refreshes a leased batch, then releases the leases with each file's next due time.
+        Returns the number of leases released.
+        """
+        schedule = {}
+        deferred: List[dict] = []
+        try:
+            async for refreshed in self.service.refresh_files(records, concurrency=self.concurrency,
+                                                              deferred=deferred):
+                if refreshed.next_fetch_at:
+                    schedule[refreshed.file_id] = refreshed.next_fetch_at
+                else:
+                    priority = refreshed.file.priority if refreshed.file else None
+                    schedule[refreshed.file_id] = datetime.now() + timedelta(seconds=revisit_interval(priority))
+        finally:
+            await self.service.repository.touch_files(deferred)
+            # Files not refreshed (e.g. on cancellation) stay leased and are retried once the lease expires.
+            released = await self.repository.release(self.owner, schedule)
+        return released
+
+    async def _process_batch(self, records, slots: asyncio.Semaphore):
+        try:
+            await self.process(records)
+        except Exception as e:
+            print(f"Scheduler: error processing a batch of {len(records)} leased files: {e}")
+        finally:
+            slots.release()
+
+    async def run(self):
+        """
+        Runs the scheduler until cancelled.
+        """
+        slots = asyncio.Semaphore(self.pipeline)
+        print(f"Lease scheduler {self.owner} starting with {self.concurrency} concurrent fetches...")
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    records = await self.claim()
+                except Exception as e:
+                    print(f"Scheduler: error claiming due files: {e}")
+                    records = []
+                if not records:
+                    slots.release()
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                task = asyncio.create_task(self._process_batch(records, slots))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+        finally:
+            for task in self._batches:
+                task.cancel()
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+
+scheduler = LeaseScheduler() if SCHEDULER_MODE == 'lease' else RecrawlScheduler()
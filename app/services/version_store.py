@@ -0,0 +1,243 @@
+import asyncio
+import difflib
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select
+
+from app.db.database import database
+from app.models.js_file_model import js_file_versions
+from app.services.blob_store import compress, decompress, zstandard
+
+# Versions per chain: every SNAPSHOT_INTERVAL-th version is stored in full, which
+# bounds how many deltas are applied to reconstruct any version.
+SNAPSHOT_INTERVAL = int(os.getenv('VERSION_SNAPSHOT_INTERVAL', '20'))
+# Largest base + target size encoded as a delta; bigger versions are stored as snapshots.
+MAX_DELTA_WINDOW_LOG = 27
+# Lines longer than this (typically minified bundles) are split at statement
+# boundaries so diffs stay readable.
+MAX_DIFF_LINE = 2000
+
+VERSION_COLUMNS = [
+    js_file_versions.c.id,
+    js_file_versions.c.file_id,
+    js_file_versions.c.seq,
+    js_file_versions.c.fetched_at,
+    js_file_versions.c.content_hash,
+    js_file_versions.c.size,
+    js_file_versions.c.is_snapshot,
+    js_file_versions.c.snapshot_id,
+    func.octet_length(js_file_versions.c.data).label("stored_size"),
+]
+
+
+def encode_delta(base: bytes, target: bytes) -> Tuple[bytes, str]:
+    """
+    Encodes target as a delta against base. With zstd the whole base is used as a
+    raw-content dictionary; the zlib fallback can only reference its last 32 KiB.
+    """
+    if zstandard is not None:
+        window_log = max(20, (len(base) + len(target)).bit_length())
+        params = zstandard.ZstdCompressionParameters(
+            window_log=window_log,
+            hash_log=min(window_log, 22),
+            chain_log=min(window_log, 22),
+            search_log=6,
+            min_match=5,
+            target_length=0,
+            strategy=zstandard.STRATEGY_LAZY2,
+        )
+        dictionary = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+        return zstandard.ZstdCompressor(dict_data=dictionary, compression_params=params).compress(target), 'zstd-delta'
+
+    compressor = zlib.compressobj(6, zdict=base[-32768:])
+    return compressor.compress(target) + compressor.flush(), 'deflate-delta'
+
+
+def apply_delta(base: bytes, data: bytes, encoding: str) -> bytes:
+    """
+    Reverses encode_delta().
+    """
+    if encoding == 'zstd-delta':
+        if zstandard is None:
+            raise RuntimeError("Version is a zstd delta but the zstandard package is not installed.")
+        dictionary = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary, max_window_size=2 ** MAX_DELTA_WINDOW_LOG)
+        return decompressor.decompress(data)
+    if encoding == 'deflate-delta':
+        decompressor = zlib.decompressobj(zdict=base[-32768:])
+        return decompressor.decompress(data) + decompressor.flush()
+    raise ValueError(f"Unknown delta encoding: {encoding}")
+
+
+def rebuild(chain) -> bytes:
+    """
+    Rebuilds the last version of a chain given its rows in seq order, starting at the snapshot.
+    """
+    content = decompress(chain[0].data, chain[0].encoding)
+    for version in chain[1:]:
+        content = apply_delta(content, version.data, version.encoding)
+    return content
+
+
+def _diff_lines(text: str) -> List[str]:
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if len(line) > MAX_DIFF_LINE:
+            lines.extend(part + '\n' for part in re.split(r'(?<=[;{}])', line.rstrip('\n')) if part)
+        else:
+            lines.append(line if line.endswith('\n') else line + '\n')
+    return lines
+
+
+@dataclass
+class PreparedVersion:
+    """
+    A version encoded ahead of VersionStore.record(), as the successor of version `seq - 1`.
+    """
+    id: UUID
+    seq: int
+    snapshot_id: UUID
+    size: int
+    encoding: str
+    data: bytes = field(repr=False)
+
+
+class VersionStore:
+    """
+    Keeps the content history of every file as chains of compressed deltas.
+
+    Each version is stored as a delta against its predecessor, with a full snapshot
+    every SNAPSHOT_INTERVAL versions, so storage grows with the size of the changes
+    rather than the size of the file.
+    """
+
+    @staticmethod
+    async def _latest(file_id: UUID):
+        return await database.fetch_one(
+            select(js_file_versions.c.seq, js_file_versions.c.snapshot_id)
+            .where(js_file_versions.c.file_id == file_id)
+            .order_by(js_file_versions.c.seq.desc())
+            .limit(1)
+        )
+
+    async def prepare(self, file_id: UUID, content: str) -> PreparedVersion:
+        """
+        Encodes the next version of a file: rebuilds the current chain and computes the
+        delta, or the snapshot, off the event loop. Call it before opening the transaction
+        that calls record(), so that transaction only runs the INSERT.
+        """
+        return await self._prepare(file_id, content, await self._latest(file_id))
+
+    async def _prepare(self, file_id: UUID, content: str, latest) -> PreparedVersion:
+        target = content.encode('utf-8')
+        version_id = uuid4()
+        seq = latest.seq + 1 if latest else 1
+
+        chain = []
+        if latest:
+            chain = await database.fetch_all(
+                select(js_file_versions.c.encoding, js_file_versions.c.data)
+                .where(js_file_versions.c.snapshot_id == latest.snapshot_id)
+                .order_by(js_file_versions.c.seq)
+            )
+
+        if chain and len(chain) < SNAPSHOT_INTERVAL:
+            data, encoding = await asyncio.to_thread(self._delta_against, chain, target)
+        else:
+            data, encoding = None, None
+        if data is None:
+            data, encoding = await asyncio.to_thread(compress, target)
+            snapshot_id = version_id
+        else:
+            snapshot_id = latest.snapshot_id
+        return PreparedVersion(version_id, seq, snapshot_id, len(target), encoding, data)
+
+    async def record(self, file_id: UUID, fetched_at: datetime, content_hash: str, content: str,
+                     prepared: Optional[PreparedVersion] = None) -> UUID:
+        """
+        Appends a new version of a file and returns its id. `prepared` is the output of
+        prepare(); it is encoded again here if it is missing or another version was
+        appended since.
+        """
+        latest = await self._latest(file_id)
+        if prepared is None or prepared.seq != (latest.seq + 1 if latest else 1):
+            prepared = await self._prepare(file_id, content, latest)
+
+        await database.execute(js_file_versions.insert().values(
+            id=prepared.id,
+            file_id=file_id,
+            seq=prepared.seq,
+            fetched_at=fetched_at,
+            content_hash=content_hash,
+            size=prepared.size,
+            is_snapshot=prepared.snapshot_id == prepared.id,
+            snapshot_id=prepared.snapshot_id,
+            encoding=prepared.encoding,
+            data=prepared.data,
+        ))
+        return prepared.id
+
+    @staticmethod
+    def _delta_against(chain, target: bytes) -> Tuple[Optional[bytes], Optional[str]]:
+        base = rebuild(chain)
+        if (len(base) + len(target)).bit_length() > MAX_DELTA_WINDOW_LOG:
+            return None, None
+        return encode_delta(base, target)
+
+    async def list_versions(self, file_id: UUID):
+        """
+        Returns the metadata of every stored version of a file, newest first.
+        """
+        return await database.fetch_all(
+            select(*VERSION_COLUMNS)
+            .where(js_file_versions.c.file_id == file_id)
+            .order_by(js_file_versions.c.seq.desc())
+        )
+
+    async def get_version(self, version_id: UUID):
+        """
+        Returns the metadata of a single version, if it exists.
+        """
+        return await database.fetch_one(select(*VERSION_COLUMNS).where(js_file_versions.c.id == version_id))
+
+    async def get_content(self, version) -> str:
+        """
+        Reconstructs the content of a version returned by get_version() or list_versions().
+        """
+        chain = await database.fetch_all(
+            select(js_file_versions.c.encoding, js_file_versions.c.data)
+            .where(js_file_versions.c.snapshot_id == version.snapshot_id)
+            .where(js_file_versions.c.seq <= version.seq)
+            .order_by(js_file_versions.c.seq)
+        )
+        content = await asyncio.to_thread(rebuild, chain)
+        return content.decode('utf-8')
+
+    async def diff(self, from_version, to_version, context_lines: int = 3) -> str:
+        """
+        Returns a unified diff between two versions.
+        """
+        from_content, to_content = await asyncio.gather(
+            self.get_content(from_version), self.get_content(to_version)
+        )
+        return await asyncio.to_thread(self._unified_diff, from_version, to_version, from_content, to_content,
+                                       context_lines)
+
+    @staticmethod
+    def _unified_diff(from_version, to_version, from_content: str, to_content: str, context_lines: int) -> str:
+        return ''.join(difflib.unified_diff(
+            _diff_lines(from_content),
+            _diff_lines(to_content),
+            fromfile=f"{from_version.file_id}@{from_version.seq}",
+            tofile=f"{to_version.file_id}@{to_version.seq}",
+            n=context_lines,
+        ))
+
+
+version_store = VersionStore()
@@ -0,0 +1,135 @@
+"""
+Stub HTTP origin serving synthetic JavaScript files for the benchmarks.
+
+Every path ending in .js is served. Each file has a version that is bumped with
+probability `change_rate` on every request, using a per-file RNG derived from the
+seed so runs are reproducible. Responses carry an ETag for the current version
+and answer If-None-Match with a 304 unless conditional requests are disabled.
+
+Run standalone with: python -m benchmarks.origin --port 8080 --size 200000
+"""
+import argparse
+import asyncio
+import random
+import zlib
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+SNIPPET = (
+    "function handler_{n}(event){{var t=event.target||{{}};"
+    "if(t.dataset&&t.dataset.track){{window.dataLayer.push({{event:'click',id:{n}}});}}"
+    "return fetch('/api/v1/items/{n}').then(function(r){{return r.json();}});}}\n"
+)
+
+
+def synthetic_body(size: int) -> bytes:
+    """
+    Builds roughly `size` bytes of plausible, compressible JavaScript.
+    """
+    parts = []
+    total = 0
+    n = 0
+    while total < size:
+        snippet = SNIPPET.format(n=n)
+        parts.append(snippet)
+        total += len(snippet)
+        n += 1
+    return ''.join(parts).encode()[:size]
+
+
+class StubOrigin:
+    """
+    aiohttp application serving versioned synthetic JS files.
+    """
+
+    def __init__(self, size: int = 100_000, latency: float = 0.0, jitter: float = 0.0,
+                 change_rate: float = 0.1, conditional: bool = True, seed: int = 0):
+        self.size = size
+        self.latency = latency
+        self.jitter = jitter
+        self.change_rate = change_rate
+        self.conditional = conditional
+        self.seed = seed
+
+        self.body = synthetic_body(size)
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._versions: Dict[str, int] = {}
+        self._rngs: Dict[str, random.Random] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def _version(self, name: str) -> int:
+        rng = self._rngs.get(name)
+        if rng is None:
+            rng = self._rngs[name] = random.Random(f"{self.seed}:{name}")
+            self._versions[name] = 0
+        elif rng.random() < self.change_rate:
+            self._versions[name] += 1
+        return self._versions[name]
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        name = request.match_info['name']
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.random() * self.jitter)
+
+        version = self._version(name)
+        etag = f'"{zlib.crc32(name.encode()):08x}-{version}"'
+        if self.conditional and request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+
+        body = f"/* {name} v{version} */\n".encode() + self.body
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type='application/javascript', headers={'ETag': etag})
+
+    def application(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/{name:.+\\.js}', self.handle)
+        return app
+
+    async def start(self, hosts: List[str], port: int = 0) -> List[str]:
+        """
+        Starts listening on every host address and returns their base URLs.
+        """
+        self._runner = web.AppRunner(self.application(), access_log=None)
+        await self._runner.setup()
+        base_urls = []
+        for host in hosts:
+            site = web.TCPSite(self._runner, host, port)
+            await site.start()
+            bound_port = site._server.sockets[0].getsockname()[1]
+            base_urls.append(f"http://{host}:{bound_port}")
+        return base_urls
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--no-304', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    origin = StubOrigin(args.size, args.latency, args.jitter, args.change_rate, not args.no_304, args.seed)
+    base_urls = await origin.start([args.host], args.port)
+    print(f"Serving synthetic JS files on {base_urls[0]}/<name>.js")
+    try:
+        await asyncio.Future()
+    finally:
+        await origin.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,16 +1,23 @@
 import asyncio
 import os
 from app.grpc_server import serve
+from app.db.database import database
 from app.messaging.consumer import start_consumer
+from app.messaging.notifier import relay
+from app.services.scheduler import scheduler
 
 async def main():
     """
-    Main function to start both the gRPC server and the RabbitMQ consumer.
+    Main function to start the gRPC server, the RabbitMQ consumer, the recrawl scheduler
+    and the change outbox relay.
     """
-    print("Starting gRPC server and RabbitMQ consumer...")
+    print("Starting gRPC server, RabbitMQ consumer, recrawl scheduler and outbox relay...")
+    await database.connect()
     await asyncio.gather(
         serve(),
-        start_consumer()
+        start_consumer(),
+        scheduler.run(),
+        relay.run(),
     )
 
 if __name__ == '__main__':
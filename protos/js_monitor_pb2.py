@@ -22,30 +22,61 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17protos/js_monitor.proto\x12\tjsmonitor\x1a\x1fgoogle/protobuf/timestamp.proto\"A\n\x0cJsFileCreate\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x10\n\x08priority\x18\x02 \x01(\x05\x12\x12\n\ncompany_id\x18\x03 \x01(\t\";\n\x11\x41\x64\x64JsFilesRequest\x12&\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x17.jsmonitor.JsFileCreate\">\n\x12\x41\x64\x64JsFilesResponse\x12(\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x19.jsmonitor.JsFileResponse\"5\n\"FetchAndUpdateJsFileContentRequest\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\"?\n\x12ListJsFilesRequest\x12\x12\n\ncompany_id\x18\x01 \x01(\t\x12\x15\n\rfetch_content\x18\x02 \x01(\x08\"?\n\x13ListJsFilesResponse\x12(\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x19.jsmonitor.JsFileResponse\"\xe3\x01\n\x0eJsFileResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0b\n\x03url\x18\x02 \x01(\t\x12\x0c\n\x04host\x18\x03 \x01(\t\x12\x14\n\x07\x63ontent\x18\x04 \x01(\tH\x00\x88\x01\x01\x12\x10\n\x08priority\x18\x05 \x01(\x05\x12\x12\n\ncompany_id\x18\x06 \x01(\t\x12\x30\n\x0clast_fetched\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x30\n\x0clast_updated\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.TimestampB\n\n\x08_content2\x94\x02\n\x10JSMonitorService\x12I\n\nAddJsFiles\x12\x1c.jsmonitor.AddJsFilesRequest\x1a\x1d.jsmonitor.AddJsFilesResponse\x12g\n\x1b\x46\x65tchAndUpdateJsFileContent\x12-.jsmonitor.FetchAndUpdateJsFileContentRequest\x1a\x19.jsmonitor.JsFileResponse\x12L\n\x0bListJsFiles\x12\x1d.jsmonitor.ListJsFilesRequest\x1a\x1e.jsmonitor.ListJsFilesResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17protos/js_monitor.proto\x12\tjsmonitor\x1a google/protobuf/field_mask.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"A\n\x0cJsFileCreate\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x10\n\x08priority\x18\x02 \x01(\x05\x12\x12\n\ncompany_id\x18\x03 \x01(\t\";\n\x11\x41\x64\x64JsFilesRequest\x12&\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x17.jsmonitor.JsFileCreate\">\n\x12\x41\x64\x64JsFilesResponse\x12(\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x19.jsmonitor.JsFileResponse\"5\n\"FetchAndUpdateJsFileContentRequest\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\"B\n\x1a\x42\x61tchFetchAndUpdateRequest\x12\x10\n\x08\x66ile_ids\x18\x01 \x03(\t\x12\x12\n\ncompany_id\x18\x02 \x01(\t\"\xf9\x01\n\x19\x42\x61tchFetchAndUpdateResult\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\x12;\n\x06status\x18\x02 \x01(\x0e\x32+.jsmonitor.BatchFetchAndUpdateResult.Status\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\'\n\x04\x66ile\x18\x04 \x01(\x0b\x32\x19.jsmonitor.JsFileResponse\"V\n\x06Status\x12\x16\n\x12STATUS_UNSPECIFIED\x10\x00\x12\x0b\n\x07\x43HANGED\x10\x01\x12\r\n\tUNCHANGED\x10\x02\x12\t\n\x05\x45RROR\x10\x03\x12\r\n\tNOT_FOUND\x10\x04\"\x89\x01\n\x12ListJsFilesRequest\x12\x12\n\ncompany_id\x18\x01 \x01(\t\x12\x15\n\rfetch_content\x18\x02 \x01(\x08\x12.\n\nfield_mask\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\x12\x18\n\x10\x61\x63\x63\x65pt_encodings\x18\x04 \x03(\t\"\xb0\x01\n\x14StreamJsFilesRequest\x12\x12\n\ncompany_id\x18\x01 \x01(\t\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x10\n\x08\x61\x66ter_id\x18\x03 \x01(\t\x12.\n\nfield_mask\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\x12\x15\n\rfetch_content\x18\x05 \x01(\x08\x12\x18\n\x10\x61\x63\x63\x65pt_encodings\x18\x06 \x03(\t\"?\n\x13ListJsFilesResponse\x12(\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x19.jsmonitor.JsFileResponse\"\xcf\x02\n\x0eJsFileResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0b\n\x03url\x18\x02 \x01(\t\x12\x0c\n\x04host\x18\x03 \x01(\t\x12\x14\n\x07\x63ontent\x18\x04 \x01(\tH\x00\x88\x01\x01\x12\x10\n\x08priority\x18\x05 \x01(\x05\x12\x12\n\ncompany_id\x18\x06 \x01(\t\x12\x30\n\x0clast_fetched\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x30\n\x0clast_updated\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x1f\n\x12\x63ompressed_content\x18\t \x01(\x0cH\x01\x88\x01\x01\x12\x1d\n\x10\x63ontent_encoding\x18\n \x01(\tH\x02\x88\x01\x01\x42\n\n\x08_contentB\x15\n\x13_compressed_contentB\x13\n\x11_content_encoding\"\xb7\x01\n\rJsFileVersion\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x66ile_id\x18\x02 \x01(\t\x12\x0b\n\x03seq\x18\x03 \x01(\x05\x12.\n\nfetched_at\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x14\n\x0c\x63ontent_hash\x18\x05 \x01(\t\x12\x0c\n\x04size\x18\x06 \x01(\x03\x12\x13\n\x0bstored_size\x18\x07 \x01(\x03\x12\x13\n\x0bis_snapshot\x18\x08 \x01(\x08\",\n\x19ListJsFileVersionsRequest\x12\x0f\n\x07\x66ile_id\x18\x01 \x01(\t\"H\n\x1aListJsFileVersionsResponse\x12*\n\x08versions\x18\x01 \x03(\x0b\x32\x18.jsmonitor.JsFileVersion\"-\n\x17GetJsFileVersionRequest\x12\x12\n\nversion_id\x18\x01 \x01(\t\"V\n\x18GetJsFileVersionResponse\x12)\n\x07version\x18\x01 \x01(\x0b\x32\x18.jsmonitor.JsFileVersion\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\"y\n\x19\x44iffJsFileVersionsRequest\x12\x17\n\x0f\x66rom_version_id\x18\x01 \x01(\t\x12\x15\n\rto_version_id\x18\x02 \x01(\t\x12\x1a\n\rcontext_lines\x18\x03 \x01(\x05H\x00\x88\x01\x01\x42\x10\n\x0e_context_lines\"\x88\x01\n\x1a\x44iffJsFileVersionsResponse\x12.\n\x0c\x66rom_version\x18\x01 \x01(\x0b\x32\x18.jsmonitor.JsFileVersion\x12,\n\nto_version\x18\x02 \x01(\x0b\x32\x18.jsmonitor.JsFileVersion\x12\x0c\n\x04\x64iff\x18\x03 \x01(\t\"=\n\x14GetHostHealthRequest\x12\r\n\x05hosts\x18\x01 \x03(\t\x12\x16\n\x0eunhealthy_only\x18\x02 \x01(\x08\"\x86\x03\n\nHostHealth\x12\x0c\n\x04host\x18\x01 \x01(\t\x12\x31\n\x05state\x18\x02 \x01(\x0e\x32\".jsmonitor.HostHealth.CircuitState\x12\x0c\n\x04rate\x18\x03 \x01(\x01\x12\x17\n\x0f\x63onfigured_rate\x18\x04 \x01(\x01\x12\x1c\n\x14\x63onsecutive_failures\x18\x05 \x01(\x05\x12\x31\n\rblocked_until\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x10\n\x08requests\x18\x07 \x01(\x03\x12\x10\n\x08\x66\x61ilures\x18\x08 \x01(\x03\x12\x12\n\nlast_error\x18\t \x01(\t\x12\x33\n\x0flast_failure_at\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"R\n\x0c\x43ircuitState\x12\x1d\n\x19\x43IRCUIT_STATE_UNSPECIFIED\x10\x00\x12\n\n\x06\x43LOSED\x10\x01\x12\x08\n\x04OPEN\x10\x02\x12\r\n\tHALF_OPEN\x10\x03\"=\n\x15GetHostHealthResponse\x12$\n\x05hosts\x18\x01 \x03(\x0b\x32\x15.jsmonitor.HostHealth2\xc0\x06\n\x10JSMonitorService\x12I\n\nAddJsFiles\x12\x1c.jsmonitor.AddJsFilesRequest\x1a\x1d.jsmonitor.AddJsFilesResponse\x12g\n\x1b\x46\x65tchAndUpdateJsFileContent\x12-.jsmonitor.FetchAndUpdateJsFileContentRequest\x1a\x19.jsmonitor.JsFileResponse\x12\x64\n\x13\x42\x61tchFetchAndUpdate\x12%.jsmonitor.BatchFetchAndUpdateRequest\x1a$.jsmonitor.BatchFetchAndUpdateResult0\x01\x12L\n\x0bListJsFiles\x12\x1d.jsmonitor.ListJsFilesRequest\x1a\x1e.jsmonitor.ListJsFilesResponse\x12M\n\rStreamJsFiles\x12\x1f.jsmonitor.StreamJsFilesRequest\x1a\x19.jsmonitor.JsFileResponse0\x01\x12\x61\n\x12ListJsFileVersions\x12$.jsmonitor.ListJsFileVersionsRequest\x1a%.jsmonitor.ListJsFileVersionsResponse\x12[\n\x10GetJsFileVersion\x12\".jsmonitor.GetJsFileVersionRequest\x1a#.jsmonitor.GetJsFileVersionResponse\x12\x61\n\x12\x44iffJsFileVersions\x12$.jsmonitor.DiffJsFileVersionsRequest\x1a%.jsmonitor.DiffJsFileVersionsResponse\x12R\n\rGetHostHealth\x12\x1f.jsmonitor.GetHostHealthRequest\x1a .jsmonitor.GetHostHealthResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protos.js_monitor_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_JSFILECREATE']._serialized_start=71
-  _globals['_JSFILECREATE']._serialized_end=136
-  _globals['_ADDJSFILESREQUEST']._serialized_start=138
-  _globals['_ADDJSFILESREQUEST']._serialized_end=197
-  _globals['_ADDJSFILESRESPONSE']._serialized_start=199
-  _globals['_ADDJSFILESRESPONSE']._serialized_end=261
-  _globals['_FETCHANDUPDATEJSFILECONTENTREQUEST']._serialized_start=263
-  _globals['_FETCHANDUPDATEJSFILECONTENTREQUEST']._serialized_end=316
-  _globals['_LISTJSFILESREQUEST']._serialized_start=318
-  _globals['_LISTJSFILESREQUEST']._serialized_end=381
-  _globals['_LISTJSFILESRESPONSE']._serialized_start=383
-  _globals['_LISTJSFILESRESPONSE']._serialized_end=446
-  _globals['_JSFILERESPONSE']._serialized_start=449
-  _globals['_JSFILERESPONSE']._serialized_end=676
-  _globals['_JSMONITORSERVICE']._serialized_start=679
-  _globals['_JSMONITORSERVICE']._serialized_end=955
+  _globals['_JSFILECREATE']._serialized_start=105
+  _globals['_JSFILECREATE']._serialized_end=170
+  _globals['_ADDJSFILESREQUEST']._serialized_start=172
+  _globals['_ADDJSFILESREQUEST']._serialized_end=231
+  _globals['_ADDJSFILESRESPONSE']._serialized_start=233
+  _globals['_ADDJSFILESRESPONSE']._serialized_end=295
+  _globals['_FETCHANDUPDATEJSFILECONTENTREQUEST']._serialized_start=297
+  _globals['_FETCHANDUPDATEJSFILECONTENTREQUEST']._serialized_end=350
+  _globals['_BATCHFETCHANDUPDATEREQUEST']._serialized_start=352
+  _globals['_BATCHFETCHANDUPDATEREQUEST']._serialized_end=418
+  _globals['_BATCHFETCHANDUPDATERESULT']._serialized_start=421
+  _globals['_BATCHFETCHANDUPDATERESULT']._serialized_end=670
+  _globals['_BATCHFETCHANDUPDATERESULT_STATUS']._serialized_start=584
+  _globals['_BATCHFETCHANDUPDATERESULT_STATUS']._serialized_end=670
+  _globals['_LISTJSFILESREQUEST']._serialized_start=673
+  _globals['_LISTJSFILESREQUEST']._serialized_end=810
+  _globals['_STREAMJSFILESREQUEST']._serialized_start=813
+  _globals['_STREAMJSFILESREQUEST']._serialized_end=989
+  _globals['_LISTJSFILESRESPONSE']._serialized_start=991
+  _globals['_LISTJSFILESRESPONSE']._serialized_end=1054
+  _globals['_JSFILERESPONSE']._serialized_start=1057
+  _globals['_JSFILERESPONSE']._serialized_end=1392
+  _globals['_JSFILEVERSION']._serialized_start=1395
+  _globals['_JSFILEVERSION']._serialized_end=1578
+  _globals['_LISTJSFILEVERSIONSREQUEST']._serialized_start=1580
+  _globals['_LISTJSFILEVERSIONSREQUEST']._serialized_end=1624
+  _globals['_LISTJSFILEVERSIONSRESPONSE']._serialized_start=1626
+  _globals['_LISTJSFILEVERSIONSRESPONSE']._serialized_end=1698
+  _globals['_GETJSFILEVERSIONREQUEST']._serialized_start=1700
+  _globals['_GETJSFILEVERSIONREQUEST']._serialized_end=1745
+  _globals['_GETJSFILEVERSIONRESPONSE']._serialized_start=1747
+  _globals['_GETJSFILEVERSIONRESPONSE']._serialized_end=1833
+  _globals['_DIFFJSFILEVERSIONSREQUEST']._serialized_start=1835
+  _globals['_DIFFJSFILEVERSIONSREQUEST']._serialized_end=1956
+  _globals['_DIFFJSFILEVERSIONSRESPONSE']._serialized_start=1959
+  _globals['_DIFFJSFILEVERSIONSRESPONSE']._serialized_end=2095
+  _globals['_GETHOSTHEALTHREQUEST']._serialized_start=2097
+  _globals['_GETHOSTHEALTHREQUEST']._serialized_end=2158
+  _globals['_HOSTHEALTH']._serialized_start=2161
+  _globals['_HOSTHEALTH']._serialized_end=2551
+  _globals['_HOSTHEALTH_CIRCUITSTATE']._serialized_start=2469
+  _globals['_HOSTHEALTH_CIRCUITSTATE']._serialized_end=2551
+  _globals['_GETHOSTHEALTHRESPONSE']._serialized_start=2553
+  _globals['_GETHOSTHEALTHRESPONSE']._serialized_end=2614
+  _globals['_JSMONITORSERVICE']._serialized_start=2617
+  _globals['_JSMONITORSERVICE']._serialized_end=3449
 # @@protoc_insertion_point(module_scope)
@@ -1,7 +1,9 @@
 import datetime
 
+from google.protobuf import field_mask_pb2 as _field_mask_pb2
 from google.protobuf import timestamp_pb2 as _timestamp_pb2
 from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from collections.abc import Iterable as _Iterable, Mapping as _Mapping
@@ -37,13 +39,65 @@ class FetchAndUpdateJsFileContentRequest(_message.Message):
     file_id: str
     def __init__(self, file_id: _Optional[str] = ...) -> None: ...
 
+class BatchFetchAndUpdateRequest(_message.Message):
+    __slots__ = ("file_ids", "company_id")
+    FILE_IDS_FIELD_NUMBER: _ClassVar[int]
+    COMPANY_ID_FIELD_NUMBER: _ClassVar[int]
+    file_ids: _containers.RepeatedScalarFieldContainer[str]
+    company_id: str
+    def __init__(self, file_ids: _Optional[_Iterable[str]] = ..., company_id: _Optional[str] = ...) -> None: ...
+
+class BatchFetchAndUpdateResult(_message.Message):
+    __slots__ = ("file_id", "status", "error", "file")
+    class Status(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = ()
+        STATUS_UNSPECIFIED: _ClassVar[BatchFetchAndUpdateResult.Status]
+        CHANGED: _ClassVar[BatchFetchAndUpdateResult.Status]
+        UNCHANGED: _ClassVar[BatchFetchAndUpdateResult.Status]
+        ERROR: _ClassVar[BatchFetchAndUpdateResult.Status]
+        NOT_FOUND: _ClassVar[BatchFetchAndUpdateResult.Status]
+    STATUS_UNSPECIFIED: BatchFetchAndUpdateResult.Status
+    CHANGED: BatchFetchAndUpdateResult.Status
+    UNCHANGED: BatchFetchAndUpdateResult.Status
+    ERROR: BatchFetchAndUpdateResult.Status
+    NOT_FOUND: BatchFetchAndUpdateResult.Status
+    FILE_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    ERROR_FIELD_NUMBER: _ClassVar[int]
+    FILE_FIELD_NUMBER: _ClassVar[int]
+    file_id: str
+    status: BatchFetchAndUpdateResult.Status
+    error: str
+    file: JsFileResponse
+    def __init__(self, file_id: _Optional[str] = ..., status: _Optional[_Union[BatchFetchAndUpdateResult.Status, str]] = ..., error: _Optional[str] = ..., file: _Optional[_Union[JsFileResponse, _Mapping]] = ...) -> None: ...
+
 class ListJsFilesRequest(_message.Message):
-    __slots__ = ("company_id", "fetch_content")
+    __slots__ = ("company_id", "fetch_content", "field_mask", "accept_encodings")
     COMPANY_ID_FIELD_NUMBER: _ClassVar[int]
     FETCH_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    FIELD_MASK_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_ENCODINGS_FIELD_NUMBER: _ClassVar[int]
     company_id: str
     fetch_content: bool
-    def __init__(self, company_id: _Optional[str] = ..., fetch_content: bool = ...) -> None: ...
+    field_mask: _field_mask_pb2.FieldMask
+    accept_encodings: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, company_id: _Optional[str] = ..., fetch_content: bool = ..., field_mask: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., accept_encodings: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class StreamJsFilesRequest(_message.Message):
+    __slots__ = ("company_id", "page_size", "after_id", "field_mask", "fetch_content", "accept_encodings")
+    COMPANY_ID_FIELD_NUMBER: _ClassVar[int]
+    PAGE_SIZE_FIELD_NUMBER: _ClassVar[int]
+    AFTER_ID_FIELD_NUMBER: _ClassVar[int]
+    FIELD_MASK_FIELD_NUMBER: _ClassVar[int]
+    FETCH_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_ENCODINGS_FIELD_NUMBER: _ClassVar[int]
+    company_id: str
+    page_size: int
+    after_id: str
+    field_mask: _field_mask_pb2.FieldMask
+    fetch_content: bool
+    accept_encodings: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, company_id: _Optional[str] = ..., page_size: _Optional[int] = ..., after_id: _Optional[str] = ..., field_mask: _Optional[_Union[_field_mask_pb2.FieldMask, _Mapping]] = ..., fetch_content: bool = ..., accept_encodings: _Optional[_Iterable[str]] = ...) -> None: ...
 
 class ListJsFilesResponse(_message.Message):
     __slots__ = ("files",)
@@ -52,7 +106,7 @@ class ListJsFilesResponse(_message.Message):
     def __init__(self, files: _Optional[_Iterable[_Union[JsFileResponse, _Mapping]]] = ...) -> None: ...
 
 class JsFileResponse(_message.Message):
-    __slots__ = ("id", "url", "host", "content", "priority", "company_id", "last_fetched", "last_updated")
+    __slots__ = ("id", "url", "host", "content", "priority", "company_id", "last_fetched", "last_updated", "compressed_content", "content_encoding")
     ID_FIELD_NUMBER: _ClassVar[int]
     URL_FIELD_NUMBER: _ClassVar[int]
     HOST_FIELD_NUMBER: _ClassVar[int]
@@ -61,6 +115,8 @@ class JsFileResponse(_message.Message):
     COMPANY_ID_FIELD_NUMBER: _ClassVar[int]
     LAST_FETCHED_FIELD_NUMBER: _ClassVar[int]
     LAST_UPDATED_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSED_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    CONTENT_ENCODING_FIELD_NUMBER: _ClassVar[int]
     id: str
     url: str
     host: str
@@ -69,4 +125,120 @@ class JsFileResponse(_message.Message):
     company_id: str
     last_fetched: _timestamp_pb2.Timestamp
     last_updated: _timestamp_pb2.Timestamp
-    def __init__(self, id: _Optional[str] = ..., url: _Optional[str] = ..., host: _Optional[str] = ..., content: _Optional[str] = ..., priority: _Optional[int] = ..., company_id: _Optional[str] = ..., last_fetched: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ..., last_updated: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ...) -> None: ...
+    compressed_content: bytes
+    content_encoding: str
+    def __init__(self, id: _Optional[str] = ..., url: _Optional[str] = ..., host: _Optional[str] = ..., content: _Optional[str] = ..., priority: _Optional[int] = ..., company_id: _Optional[str] = ..., last_fetched: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ..., last_updated: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ..., compressed_content: _Optional[bytes] = ..., content_encoding: _Optional[str] = ...) -> None: ...
+
+class JsFileVersion(_message.Message):
+    __slots__ = ("id", "file_id", "seq", "fetched_at", "content_hash", "size", "stored_size", "is_snapshot")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    FILE_ID_FIELD_NUMBER: _ClassVar[int]
+    SEQ_FIELD_NUMBER: _ClassVar[int]
+    FETCHED_AT_FIELD_NUMBER: _ClassVar[int]
+    CONTENT_HASH_FIELD_NUMBER: _ClassVar[int]
+    SIZE_FIELD_NUMBER: _ClassVar[int]
+    STORED_SIZE_FIELD_NUMBER: _ClassVar[int]
+    IS_SNAPSHOT_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    file_id: str
+    seq: int
+    fetched_at: _timestamp_pb2.Timestamp
+    content_hash: str
+    size: int
+    stored_size: int
+    is_snapshot: bool
+    def __init__(self, id: _Optional[str] = ..., file_id: _Optional[str] = ..., seq: _Optional[int] = ..., fetched_at: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ..., content_hash: _Optional[str] = ..., size: _Optional[int] = ..., stored_size: _Optional[int] = ..., is_snapshot: bool = ...) -> None: ...
+
+class ListJsFileVersionsRequest(_message.Message):
+    __slots__ = ("file_id",)
+    FILE_ID_FIELD_NUMBER: _ClassVar[int]
+    file_id: str
+    def __init__(self, file_id: _Optional[str] = ...) -> None: ...
+
+class ListJsFileVersionsResponse(_message.Message):
+    __slots__ = ("versions",)
+    VERSIONS_FIELD_NUMBER: _ClassVar[int]
+    versions: _containers.RepeatedCompositeFieldContainer[JsFileVersion]
+    def __init__(self, versions: _Optional[_Iterable[_Union[JsFileVersion, _Mapping]]] = ...) -> None: ...
+
+class GetJsFileVersionRequest(_message.Message):
+    __slots__ = ("version_id",)
+    VERSION_ID_FIELD_NUMBER: _ClassVar[int]
+    version_id: str
+    def __init__(self, version_id: _Optional[str] = ...) -> None: ...
+
+class GetJsFileVersionResponse(_message.Message):
+    __slots__ = ("version", "content")
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    CONTENT_FIELD_NUMBER: _ClassVar[int]
+    version: JsFileVersion
+    content: str
+    def __init__(self, version: _Optional[_Union[JsFileVersion, _Mapping]] = ..., content: _Optional[str] = ...) -> None: ...
+
+class DiffJsFileVersionsRequest(_message.Message):
+    __slots__ = ("from_version_id", "to_version_id", "context_lines")
+    FROM_VERSION_ID_FIELD_NUMBER: _ClassVar[int]
+    TO_VERSION_ID_FIELD_NUMBER: _ClassVar[int]
+    CONTEXT_LINES_FIELD_NUMBER: _ClassVar[int]
+    from_version_id: str
+    to_version_id: str
+    context_lines: int
+    def __init__(self, from_version_id: _Optional[str] = ..., to_version_id: _Optional[str] = ..., context_lines: _Optional[int] = ...) -> None: ...
+
+class DiffJsFileVersionsResponse(_message.Message):
+    __slots__ = ("from_version", "to_version", "diff")
+    FROM_VERSION_FIELD_NUMBER: _ClassVar[int]
+    TO_VERSION_FIELD_NUMBER: _ClassVar[int]
+    DIFF_FIELD_NUMBER: _ClassVar[int]
+    from_version: JsFileVersion
+    to_version: JsFileVersion
+    diff: str
+    def __init__(self, from_version: _Optional[_Union[JsFileVersion, _Mapping]] = ..., to_version: _Optional[_Union[JsFileVersion, _Mapping]] = ..., diff: _Optional[str] = ...) -> None: ...
+
+class GetHostHealthRequest(_message.Message):
+    __slots__ = ("hosts", "unhealthy_only")
+    HOSTS_FIELD_NUMBER: _ClassVar[int]
+    UNHEALTHY_ONLY_FIELD_NUMBER: _ClassVar[int]
+    hosts: _containers.RepeatedScalarFieldContainer[str]
+    unhealthy_only: bool
+    def __init__(self, hosts: _Optional[_Iterable[str]] = ..., unhealthy_only: bool = ...) -> None: ...
+
+class HostHealth(_message.Message):
+    __slots__ = ("host", "state", "rate", "configured_rate", "consecutive_failures", "blocked_until", "requests", "failures", "last_error", "last_failure_at")
+    class CircuitState(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = ()
+        CIRCUIT_STATE_UNSPECIFIED: _ClassVar[HostHealth.CircuitState]
+        CLOSED: _ClassVar[HostHealth.CircuitState]
+        OPEN: _ClassVar[HostHealth.CircuitState]
+        HALF_OPEN: _ClassVar[HostHealth.CircuitState]
+    CIRCUIT_STATE_UNSPECIFIED: HostHealth.CircuitState
+    CLOSED: HostHealth.CircuitState
+    OPEN: HostHealth.CircuitState
+    HALF_OPEN: HostHealth.CircuitState
+    HOST_FIELD_NUMBER: _ClassVar[int]
+    STATE_FIELD_NUMBER: _ClassVar[int]
+    RATE_FIELD_NUMBER: _ClassVar[int]
+    CONFIGURED_RATE_FIELD_NUMBER: _ClassVar[int]
+    CONSECUTIVE_FAILURES_FIELD_NUMBER: _ClassVar[int]
+    BLOCKED_UNTIL_FIELD_NUMBER: _ClassVar[int]
+    REQUESTS_FIELD_NUMBER: _ClassVar[int]
+    FAILURES_FIELD_NUMBER: _ClassVar[int]
+    LAST_ERROR_FIELD_NUMBER: _ClassVar[int]
+    LAST_FAILURE_AT_FIELD_NUMBER: _ClassVar[int]
+    host: str
+    state: HostHealth.CircuitState
+    rate: float
+    configured_rate: float
+    consecutive_failures: int
+    blocked_until: _timestamp_pb2.Timestamp
+    requests: int
+    failures: int
+    last_error: str
+    last_failure_at: _timestamp_pb2.Timestamp
+    def __init__(self, host: _Optional[str] = ..., state: _Optional[_Union[HostHealth.CircuitState, str]] = ..., rate: _Optional[float] = ..., configured_rate: _Optional[float] = ..., consecutive_failures: _Optional[int] = ..., blocked_until: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ..., requests: _Optional[int] = ..., failures: _Optional[int] = ..., last_error: _Optional[str] = ..., last_failure_at: _Optional[_Union[datetime.datetime, _timestamp_pb2.Timestamp, _Mapping]] = ...) -> None: ...
+
+class GetHostHealthResponse(_message.Message):
+    __slots__ = ("hosts",)
+    HOSTS_FIELD_NUMBER: _ClassVar[int]
+    hosts: _containers.RepeatedCompositeFieldContainer[HostHealth]
+    def __init__(self, hosts: _Optional[_Iterable[_Union[HostHealth, _Mapping]]] = ...) -> None: ...
@@ -45,11 +45,41 @@ class JSMonitorServiceStub(object):
                 request_serializer=protos_dot_js__monitor__pb2.FetchAndUpdateJsFileContentRequest.SerializeToString,
                 response_deserializer=protos_dot_js__monitor__pb2.JsFileResponse.FromString,
                 _registered_method=True)
+        self.BatchFetchAndUpdate = channel.unary_stream(
+                '/jsmonitor.JSMonitorService/BatchFetchAndUpdate',
+                request_serializer=protos_dot_js__monitor__pb2.BatchFetchAndUpdateRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.BatchFetchAndUpdateResult.FromString,
+                _registered_method=True)
         self.ListJsFiles = channel.unary_unary(
                 '/jsmonitor.JSMonitorService/ListJsFiles',
                 request_serializer=protos_dot_js__monitor__pb2.ListJsFilesRequest.SerializeToString,
                 response_deserializer=protos_dot_js__monitor__pb2.ListJsFilesResponse.FromString,
                 _registered_method=True)
+        self.StreamJsFiles = channel.unary_stream(
+                '/jsmonitor.JSMonitorService/StreamJsFiles',
+                request_serializer=protos_dot_js__monitor__pb2.StreamJsFilesRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.JsFileResponse.FromString,
+                _registered_method=True)
+        self.ListJsFileVersions = channel.unary_unary(
+                '/jsmonitor.JSMonitorService/ListJsFileVersions',
+                request_serializer=protos_dot_js__monitor__pb2.ListJsFileVersionsRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.ListJsFileVersionsResponse.FromString,
+                _registered_method=True)
+        self.GetJsFileVersion = channel.unary_unary(
+                '/jsmonitor.JSMonitorService/GetJsFileVersion',
+                request_serializer=protos_dot_js__monitor__pb2.GetJsFileVersionRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.GetJsFileVersionResponse.FromString,
+                _registered_method=True)
+        self.DiffJsFileVersions = channel.unary_unary(
+                '/jsmonitor.JSMonitorService/DiffJsFileVersions',
+                request_serializer=protos_dot_js__monitor__pb2.DiffJsFileVersionsRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.DiffJsFileVersionsResponse.FromString,
+                _registered_method=True)
+        self.GetHostHealth = channel.unary_unary(
+                '/jsmonitor.JSMonitorService/GetHostHealth',
+                request_serializer=protos_dot_js__monitor__pb2.GetHostHealthRequest.SerializeToString,
+                response_deserializer=protos_dot_js__monitor__pb2.GetHostHealthResponse.FromString,
+                _registered_method=True)
 
 
 class JSMonitorServiceServicer(object):
@@ -70,6 +100,13 @@ class JSMonitorServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchFetchAndUpdate(self, request, context):
+        """Fetches and updates many files, streaming each file's outcome as soon as it is known.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListJsFiles(self, request, context):
         """Lists all JS files, optionally filtered by company ID and with optional content fetching.
         """
@@ -77,6 +114,41 @@ class JSMonitorServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamJsFiles(self, request, context):
+        """Streams JS files in id order using keyset pagination, optionally filtered by company ID.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListJsFileVersions(self, request, context):
+        """Lists the stored content versions of a file, newest first.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJsFileVersion(self, request, context):
+        """Returns the reconstructed content of a stored version.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DiffJsFileVersions(self, request, context):
+        """Returns a unified diff between two stored versions.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetHostHealth(self, request, context):
+        """Returns the rate limit, backoff and circuit breaker state of the hosts fetched by the serving node.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_JSMonitorServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -90,11 +162,41 @@ def add_JSMonitorServiceServicer_to_server(servicer, server):
                     request_deserializer=protos_dot_js__monitor__pb2.FetchAndUpdateJsFileContentRequest.FromString,
                     response_serializer=protos_dot_js__monitor__pb2.JsFileResponse.SerializeToString,
             ),
+            'BatchFetchAndUpdate': grpc.unary_stream_rpc_method_handler(
+                    servicer.BatchFetchAndUpdate,
+                    request_deserializer=protos_dot_js__monitor__pb2.BatchFetchAndUpdateRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.BatchFetchAndUpdateResult.SerializeToString,
+            ),
             'ListJsFiles': grpc.unary_unary_rpc_method_handler(
                     servicer.ListJsFiles,
                     request_deserializer=protos_dot_js__monitor__pb2.ListJsFilesRequest.FromString,
                     response_serializer=protos_dot_js__monitor__pb2.ListJsFilesResponse.SerializeToString,
             ),
+            'StreamJsFiles': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamJsFiles,
+                    request_deserializer=protos_dot_js__monitor__pb2.StreamJsFilesRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.JsFileResponse.SerializeToString,
+            ),
+            'ListJsFileVersions': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListJsFileVersions,
+                    request_deserializer=protos_dot_js__monitor__pb2.ListJsFileVersionsRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.ListJsFileVersionsResponse.SerializeToString,
+            ),
+            'GetJsFileVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJsFileVersion,
+                    request_deserializer=protos_dot_js__monitor__pb2.GetJsFileVersionRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.GetJsFileVersionResponse.SerializeToString,
+            ),
+            'DiffJsFileVersions': grpc.unary_unary_rpc_method_handler(
+                    servicer.DiffJsFileVersions,
+                    request_deserializer=protos_dot_js__monitor__pb2.DiffJsFileVersionsRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.DiffJsFileVersionsResponse.SerializeToString,
+            ),
+            'GetHostHealth': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHostHealth,
+                    request_deserializer=protos_dot_js__monitor__pb2.GetHostHealthRequest.FromString,
+                    response_serializer=protos_dot_js__monitor__pb2.GetHostHealthResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'jsmonitor.JSMonitorService', rpc_method_handlers)
@@ -161,6 +263,33 @@ class JSMonitorService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BatchFetchAndUpdate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/BatchFetchAndUpdate',
+            protos_dot_js__monitor__pb2.BatchFetchAndUpdateRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.BatchFetchAndUpdateResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListJsFiles(request,
             target,
@@ -187,3 +316,138 @@ class JSMonitorService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamJsFiles(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/StreamJsFiles',
+            protos_dot_js__monitor__pb2.StreamJsFilesRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.JsFileResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListJsFileVersions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/ListJsFileVersions',
+            protos_dot_js__monitor__pb2.ListJsFileVersionsRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.ListJsFileVersionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJsFileVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/GetJsFileVersion',
+            protos_dot_js__monitor__pb2.GetJsFileVersionRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.GetJsFileVersionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DiffJsFileVersions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/DiffJsFileVersions',
+            protos_dot_js__monitor__pb2.DiffJsFileVersionsRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.DiffJsFileVersionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetHostHealth(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/jsmonitor.JSMonitorService/GetHostHealth',
+            protos_dot_js__monitor__pb2.GetHostHealthRequest.SerializeToString,
+            protos_dot_js__monitor__pb2.GetHostHealthResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,52 @@
+import pytest
+
+from app.services.fingerprint import fingerprint
+
+# (name, before, after, whether the two must get the same fingerprint)
+CASES = [
+    # Cosmetic edits.
+    ("whitespace", "var a = 1;\nfunction f(x) { return x * 2; }", "var a=1;function f(x){return x*2;}", True),
+    ("licence banner", "/*! v1.2.3 | MIT */var a=1;", "/*! v1.2.4 | MIT */var a=1;", True),
+    ("source map comment", "var a=1;\n//# sourceMappingURL=main.3f2a1b9c.js.map",
+     "var a=1;\n//# sourceMappingURL=main.9e8d7c6b.js.map", True),
+    ("hex asset hash", 'import("./main.3f2a1b9c.chunk.js")', 'import("./main.9e8d7c6b.chunk.js")', True),
+    ("vite asset hash", 'import("./index-BzX9_a1c.js")', 'import("./index-Qw3r_T7y.js")', True),
+    ("build timestamp", 'var built="2024-05-01T12:00:00Z";', 'var built="2024-06-02T08:30:00Z";', True),
+    ("renumbered webpack modules",
+     "(self.c=self.c||[]).push([[1],{123:function(e,t,n){var r=n(456);e.exports=r},"
+     "456:(e,t,n)=>{e.exports=1}}]);",
+     "(self.c=self.c||[]).push([[1],{789:function(e,t,n){var r=n(12);e.exports=r},"
+     "12:(e,t,n)=>{e.exports=1}}]);", True),
+    ("renumbered __webpack_require__", "var a=__webpack_require__(10);", "var a=__webpack_require__(20);", True),
+    ("renumbered and retargeted require",
+     "({1:function(e,t,n){var r=n(2)},2:function(e,t,n){e.exports=2},3:function(e,t,n){e.exports=3}})",
+     "({7:function(e,t,n){var r=n(8)},8:function(e,t,n){e.exports=2},9:function(e,t,n){e.exports=3}})", True),
+
+    # Semantic edits that look like cosmetic ones.
+    ("swapped values of a numeric-keyed map", 'var m={200:"ok",404:"missing"};', 'var m={200:"missing",404:"ok"};', False),
+    ("changed value of a numeric-keyed map", 'var m={200:"ok",404:"missing"};', 'var m={200:"ok",404:"gone"};', False),
+    ("swapped webpack module bodies",
+     "({1:function(e,t,n){e.exports=1},2:function(e,t,n){e.exports=2}})",
+     "({1:function(e,t,n){e.exports=2},2:function(e,t,n){e.exports=1}})", False),
+    ("retargeted require",
+     "({1:function(e,t,n){var r=n(2)},2:function(e,t,n){e.exports=2},3:function(e,t,n){e.exports=3}})",
+     "({1:function(e,t,n){var r=n(3)},2:function(e,t,n){e.exports=2},3:function(e,t,n){e.exports=3}})", False),
+    ("retargeted __webpack_require__",
+     "__webpack_require__(5);__webpack_require__(6);__webpack_require__(5);",
+     "__webpack_require__(5);__webpack_require__(6);__webpack_require__(6);", False),
+    ("one-letter call argument", "a(1);", "a(2);", False),
+    ("require name outside its module", "({1:function(e,t,n){}});n(1);", "({1:function(e,t,n){}});n(2);", False),
+    ("method call named like require", "({1:function(e,t,n){e.n(1)}})", "({1:function(e,t,n){e.n(2)}})", False),
+    ("hex string", 'var k="deadbeef12";', 'var k="cafebabe34";', False),
+    ("hash in an integrity attribute", 'var s="sha384-3f2a1b9c4d5e";', 'var s="sha384-9e8d7c6b5a4f";', False),
+    ("plain word before an extension", 'import("./polyfill.js")', 'import("./polyfils.js")', False),
+    ("epoch number", "var t=1700000000;", "var t=1800000000;", False),
+    ("date without a time", 'var cutoff="2024-05-01";', 'var cutoff="2025-05-01";', False),
+    ("changed call", "console.log(1);", "console.warn(1);", False),
+]
+
+
+
+@pytest.mark.parametrize("name, before, after, same", CASES, ids=[case[0] for case in CASES])
+def test_fingerprint(name, before, after, same):
+    assert (fingerprint(before) == fingerprint(after)) == same